@@ -258,23 +258,56 @@ class DirectoryManager:
                 return {"exists": False}
 
             stat_info = directory.stat()
+            is_directory = directory.is_dir()
+            total_size, entry_count = (
+                self._scan_tree(directory) if is_directory else (0, 0)
+            )
             return {
                 "exists": True,
-                "is_directory": directory.is_dir(),
-                "size_mb": sum(
-                    f.stat().st_size for f in directory.rglob("*") if f.is_file()
-                )
-                / (1024 * 1024),
+                "is_directory": is_directory,
+                "size_mb": total_size / (1024 * 1024),
                 "owner_uid": stat_info.st_uid,
                 "owner_gid": stat_info.st_gid,
                 "permissions": oct(stat_info.st_mode)[-3:],
-                "file_count": (
-                    len(list(directory.rglob("*"))) if directory.is_dir() else 0
-                ),
+                "file_count": entry_count,
             }
         except Exception as e:
             return {"exists": True, "error": str(e)}
 
+    def _scan_tree(self, directory: Path) -> Tuple[int, int]:
+        """
+        Walk a directory tree once with os.scandir.
+
+        Like the rglob walk it replaces, symlinked directories are counted but
+        not descended into, symlinks to files add their target's size, and
+        subdirectories that can't be read are skipped.
+
+        Args:
+            directory: Root of the tree to walk
+
+        Returns:
+            Tuple of (total file size in bytes, number of entries)
+        """
+        total_size = 0
+        entry_count = 0
+        pending = [directory]
+
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    entry_count += 1
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        total_size += entry.stat().st_size
+
+        return total_size, entry_count
+
     def cleanup_empty_directories(self, base_path: Path) -> int:
         """
         Remove empty directories under the base path.
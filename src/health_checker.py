@@ -10,15 +10,22 @@ Provides comprehensive validation of:
 """
 
 import json
-import socket
+import re
 import subprocess
+import threading
 import time
+from contextlib import closing
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-from urllib.error import URLError
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 from urllib.request import urlopen
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .utils import (
     Colors,
     print_error,
@@ -28,6 +35,65 @@ from .utils import (
     run_command,
 )
 
+# Seconds a successful Docker daemon query is reused before re-running it
+DOCKER_CACHE_TTL = 30
+
+# Seconds a web UI probe result is reused for the same service and URL
+WEB_UI_CACHE_TTL = 10
+
+# Seconds the `docker ps` container snapshot is trusted before re-querying
+CONTAINER_SNAPSHOT_TTL = 5
+
+# Seconds `docker stats` output is reused; each query blocks for 1-2 seconds
+CONTAINER_STATS_TTL = 60
+
+# Byte multipliers for the size units `docker stats` prints
+_DOCKER_SIZE_UNITS = {
+    "b": 1,
+    "kb": 1000,
+    "mb": 1000**2,
+    "gb": 1000**3,
+    "tb": 1000**4,
+    "kib": 1024,
+    "mib": 1024**2,
+    "gib": 1024**3,
+    "tib": 1024**4,
+}
+_DOCKER_SIZE_RE = re.compile(r"([\d.]+)\s*([a-z]+)", re.IGNORECASE)
+
+# Plain-text public IP endpoint used for the host side of the VPN check
+PUBLIC_IP_URL = "https://ifconfig.me/ip"
+
+# Case-insensitive log line patterns; errors take priority over warnings
+_LOG_ERROR_RE = re.compile(
+    r"error|fatal|exception|failed|cannot|unable|connection refused|timeout"
+    r"|permission denied",
+    re.IGNORECASE,
+)
+_LOG_WARNING_RE = re.compile(r"warn|deprecated|retry|fallback", re.IGNORECASE)
+
+# Number of recent log lines streamed from each container
+LOG_TAIL_LINES = 50
+
+
+def _now_iso() -> str:
+    """Return the current UTC time as an ISO 8601 string for reports."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse_docker_size(text: str) -> int:
+    """Convert a docker size such as "512MiB" or "1.2GB" to bytes."""
+    if not text.strip():
+        return 0
+    match = _DOCKER_SIZE_RE.fullmatch(text.strip())
+    if not match or match.group(2).lower() not in _DOCKER_SIZE_UNITS:
+        raise ValueError(f"Unrecognized size: {text!r}")
+    return int(float(match.group(1)) * _DOCKER_SIZE_UNITS[match.group(2).lower()])
+
+
+# A per-service check step: (health, service_name, service_config) -> None
+ServiceProbe = Callable[[Dict[str, Any], str, Dict[str, Any]], None]
+
 
 class ServiceHealthChecker:
     """Comprehensive health checking for media server services."""
@@ -37,14 +103,66 @@ class ServiceHealthChecker:
         self.media_dir = media_dir
         self.services_config = {}
         self.health_results = {}
+        self._service_probes: Dict[str, List[ServiceProbe]] = {}
+        self._docker_cache: Dict[Tuple[str, ...], Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self._local_ip_cache: Optional[str] = None
+        self._web_cache: Dict[Tuple[str, str], Tuple[bool, float]] = {}
+        self._container_snapshot: Optional[Dict[str, Dict[str, Any]]] = None
+        self._snapshot_expires = 0.0
+        self._snapshot_lock = threading.Lock()
+        self._container_stats: Optional[Dict[str, Dict[str, Any]]] = None
+        self._stats_expires = 0.0
+        self._stats_lock = threading.Lock()
 
     def load_service_config(self, services_config: Dict[str, Any]) -> None:
         """Load service configuration for health checking."""
         self.services_config = services_config
+        self._service_probes = {
+            name: self._build_service_probes(config)
+            for name, config in services_config.items()
+        }
+
+    def _build_service_probes(
+        self, service_config: Dict[str, Any]
+    ) -> List[ServiceProbe]:
+        """Select the checks that apply to a service once, at load time."""
+        probes = [self._probe_container_health, self._probe_ports]
+        if service_config.get("setup_url"):
+            probes.append(self._probe_web_ui)
+        probes.extend([self._probe_logs, self._probe_resource_usage])
+        return probes
+
+    def invalidate_docker_cache(self) -> None:
+        """Drop cached Docker daemon query results."""
+        self._docker_cache.clear()
+        self._container_snapshot = None
+        self._container_stats = None
+
+    def invalidate_web_cache(self) -> None:
+        """Drop cached web UI probe results."""
+        self._web_cache.clear()
+
+    def _cached_run(
+        self, command: List[str], ttl: float = DOCKER_CACHE_TTL
+    ) -> subprocess.CompletedProcess:
+        """Run a Docker query, reusing a successful result for ttl seconds."""
+        key = tuple(command)
+        cached = self._docker_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        result = run_command(command, check=False)
+        if result.returncode == 0:
+            with self._lock:
+                self._docker_cache[key] = (result, now + ttl)
+        return result
 
     def check_all_services(self, selected_services: List[str]) -> Dict[str, Any]:
         """Run comprehensive health checks on all selected services."""
         print_info("🏥 Starting comprehensive service health checks...")
+        started_ns = time.monotonic_ns()
 
         results = {
             "overall_status": "unknown",
@@ -55,15 +173,28 @@ class ServiceHealthChecker:
             "environment_validation": {},
             "vpn_status": {},
             "timestamp": time.time(),
+            "checked_at": _now_iso(),
+            "duration_ms": 0.0,
         }
 
         # 1. Basic Docker health
         results["docker_health"] = self._check_docker_health()
 
-        # 2. Container status and basic connectivity
+        # Snapshot all container state once instead of probing per service;
+        # resource stats are only queried once a running service asks for them
+        self._refresh_container_snapshot()
+
+        # 2. Container status and basic connectivity (checked concurrently)
         for service in selected_services:
             print_info(f"Checking service: {service}")
-            results["services"][service] = self._check_service_health(service)
+        if selected_services:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=len(selected_services)) as executor:
+                service_health = executor.map(
+                    self._check_service_health, selected_services
+                )
+                results["services"] = dict(zip(selected_services, service_health))
 
         # 3. Network connectivity matrix
         results["network_connectivity"] = self._check_network_connectivity(
@@ -84,8 +215,10 @@ class ServiceHealthChecker:
 
         # Determine overall status
         results["overall_status"] = self._determine_overall_status(results)
+        results["duration_ms"] = (time.monotonic_ns() - started_ns) / 1_000_000
 
-        self.health_results = results
+        with self._lock:
+            self.health_results = results
         self._print_health_summary(results)
 
         return results
@@ -103,7 +236,7 @@ class ServiceHealthChecker:
 
         try:
             # Check Docker daemon
-            result = run_command(["docker", "info"], check=False)
+            result = self._cached_run(["docker", "info"])
             health["daemon_running"] = result.returncode == 0
 
             if not health["daemon_running"]:
@@ -111,16 +244,16 @@ class ServiceHealthChecker:
                 return health
 
             # Check Docker Compose
-            result = run_command(["docker", "compose", "version"], check=False)
+            result = self._cached_run(["docker", "compose", "version"])
             health["compose_available"] = result.returncode == 0
 
             # Get system info
-            result = run_command(["docker", "system", "df"], check=False)
+            result = self._cached_run(["docker", "system", "df"])
             if result.returncode == 0:
                 health["disk_space"] = self._parse_docker_disk_usage(result.stdout)
 
             # Check networks
-            result = run_command(["docker", "network", "ls"], check=False)
+            result = self._cached_run(["docker", "network", "ls"])
             if result.returncode == 0:
                 networks = [
                     line.split()[1] for line in result.stdout.strip().split("\n")[1:]
@@ -156,39 +289,57 @@ class ServiceHealthChecker:
                 health["issues"].append(f"Container {service_name} is not running")
                 return health
 
-            # Check container health status
-            health["container_healthy"] = self._check_container_health_status(
-                service_name
-            )
-
-            # Get service config
+            # Get service config and run the checks selected for it
             service_config = self.services_config.get(service_name, {})
+            probes = self._service_probes.get(service_name)
+            if probes is None:
+                probes = self._build_service_probes(service_config)
 
-            # Check port accessibility
-            health["ports_accessible"] = self._check_service_ports(
-                service_name, service_config
-            )
-
-            # Check web UI if service has one
-            if "setup_url" in service_config and service_config["setup_url"]:
-                health["web_ui_responsive"] = self._check_web_ui_health(
-                    service_name, service_config
-                )
-
-            # Analyze container logs for issues
-            log_analysis = self._analyze_container_logs(service_name)
-            health["logs_healthy"] = log_analysis["healthy"]
-            health["issues"].extend(log_analysis["errors"])
-            health["warnings"].extend(log_analysis["warnings"])
-
-            # Get resource usage
-            health["resource_usage"] = self._get_container_resource_usage(service_name)
+            for probe in probes:
+                probe(health, service_name, service_config)
 
         except Exception as e:
             health["issues"].append(f"Health check failed for {service_name}: {str(e)}")
 
         return health
 
+    def _probe_container_health(
+        self, health: Dict[str, Any], service_name: str, service_config: Dict[str, Any]
+    ) -> None:
+        """Record the container's Docker health status."""
+        health["container_healthy"] = self._check_container_health_status(service_name)
+
+    def _probe_ports(
+        self, health: Dict[str, Any], service_name: str, service_config: Dict[str, Any]
+    ) -> None:
+        """Record port accessibility for the service."""
+        health["ports_accessible"] = self._check_service_ports(
+            service_name, service_config
+        )
+
+    def _probe_web_ui(
+        self, health: Dict[str, Any], service_name: str, service_config: Dict[str, Any]
+    ) -> None:
+        """Record whether the service web UI responds."""
+        health["web_ui_responsive"] = self._check_web_ui_health(
+            service_name, service_config
+        )
+
+    def _probe_logs(
+        self, health: Dict[str, Any], service_name: str, service_config: Dict[str, Any]
+    ) -> None:
+        """Analyze container logs for issues."""
+        log_analysis = self._analyze_container_logs(service_name)
+        health["logs_healthy"] = log_analysis["healthy"]
+        health["issues"].extend(log_analysis["errors"])
+        health["warnings"].extend(log_analysis["warnings"])
+
+    def _probe_resource_usage(
+        self, health: Dict[str, Any], service_name: str, service_config: Dict[str, Any]
+    ) -> None:
+        """Record container resource usage."""
+        health["resource_usage"] = self._get_container_resource_usage(service_name)
+
     def _check_network_connectivity(self, services: List[str]) -> Dict[str, Any]:
         """Test network connectivity between services."""
         connectivity = {
@@ -374,48 +525,82 @@ class ServiceHealthChecker:
 
         return vpn_health
 
+    def _refresh_container_snapshot(
+        self, force: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """Load the state of all containers with one docker ps call.
+
+        Without force, a snapshot that another thread refreshed while this one
+        waited for the lock is reused instead of querying docker again.
+        """
+        with self._snapshot_lock:
+            if (
+                not force
+                and self._container_snapshot is not None
+                and time.monotonic() < self._snapshot_expires
+            ):
+                return self._container_snapshot
+
+            self._container_snapshot = self._query_containers(
+                ["docker", "ps", "-a", "--format", "{{json .}}"], "Names"
+            )
+            self._snapshot_expires = time.monotonic() + CONTAINER_SNAPSHOT_TTL
+            return self._container_snapshot
+
+    def _query_containers(
+        self, command: List[str], name_key: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run a docker listing command and index its JSON lines by container."""
+        containers = {}
+        try:
+            result = run_command(command, check=False)
+            if result.returncode != 0:
+                return containers
+
+            for line in result.stdout.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                for name in entry.get(name_key, "").split(","):
+                    containers[name] = entry
+        except (subprocess.SubprocessError, OSError, ValueError) as e:
+            print_warning(f"Failed to read output of {' '.join(command[:2])}: {e}")
+
+        return containers
+
+    def _get_container_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the container snapshot, re-querying it once it has expired."""
+        snapshot = self._container_snapshot
+        if snapshot is None or time.monotonic() >= self._snapshot_expires:
+            snapshot = self._refresh_container_snapshot(force=False)
+        return snapshot
+
+    def _get_container_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return resource usage for all containers, querying docker stats lazily."""
+        with self._stats_lock:
+            if self._container_stats is None or time.monotonic() >= self._stats_expires:
+                self._container_stats = self._query_containers(
+                    ["docker", "stats", "--no-stream", "--format", "{{json .}}"],
+                    "Name",
+                )
+                self._stats_expires = time.monotonic() + CONTAINER_STATS_TTL
+            return self._container_stats
+
     def _is_container_running(self, container_name: str) -> bool:
         """Check if a container is running."""
-        try:
-            result = run_command(
-                [
-                    "docker",
-                    "ps",
-                    "--filter",
-                    f"name=^{container_name}$",
-                    "--format",
-                    "{{.Names}}",
-                ],
-                check=False,
-            )
-            return container_name in result.stdout
-        except:
-            return False
+        container = self._get_container_snapshot().get(container_name)
+        return container is not None and container.get("State") == "running"
 
     def _check_container_health_status(self, container_name: str) -> bool:
         """Check Docker health status of container."""
-        try:
-            result = run_command(
-                [
-                    "docker",
-                    "inspect",
-                    container_name,
-                    "--format",
-                    "{{.State.Health.Status}}",
-                ],
-                check=False,
-            )
-
-            if result.returncode == 0:
-                health_status = result.stdout.strip()
-                return health_status in [
-                    "healthy",
-                    "",
-                ]  # "" means no healthcheck defined
-            return False
-        except:
+        container = self._get_container_snapshot().get(container_name)
+        if container is None:
             return False
 
+        # Status reads e.g. "Up 2 hours (healthy)"; no suffix means no healthcheck
+        status = container.get("Status", "")
+        return "(unhealthy)" not in status and "(health: starting)" not in status
+
     def _check_service_ports(
         self, service_name: str, service_config: Dict[str, Any]
     ) -> Dict[str, bool]:
@@ -445,70 +630,65 @@ class ServiceHealthChecker:
         if not setup_url or setup_url == "null":
             return True  # No web UI to check
 
-        try:
-            # Replace placeholder with localhost
-            url = setup_url.replace("{host_ip}", "localhost")
+        # Replace placeholder with localhost
+        url = setup_url.replace("{host_ip}", "localhost")
 
+        key = (service_name, url)
+        cached = self._web_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        try:
             # Try to connect
             response = urlopen(url, timeout=10)
-            return response.getcode() in [200, 401, 302, 403]  # Accept auth redirects
-        except:
-            return False
+            responsive = response.getcode() in [200, 401, 302, 403]  # Auth redirects
+        except Exception:
+            return False  # Not cached; a timeout or dropped connection may be brief
+
+        with self._lock:
+            self._web_cache[key] = (responsive, now + WEB_UI_CACHE_TTL)
+        return responsive
+
+    def _stream_container_logs(
+        self, container_name: str, tail: int = LOG_TAIL_LINES
+    ) -> Iterator[str]:
+        """Yield recent container log lines without buffering the whole log."""
+        process = subprocess.Popen(
+            ["docker", "logs", "--tail", str(tail), container_name],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        try:
+            yield from process.stdout
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
 
     def _analyze_container_logs(self, container_name: str) -> Dict[str, Any]:
         """Analyze container logs for errors and warnings."""
         analysis = {"healthy": True, "errors": [], "warnings": []}
 
         try:
-            result = run_command(
-                ["docker", "logs", "--tail", "100", container_name], check=False
-            )
-            if result.returncode != 0:
-                return analysis
-
-            logs = result.stdout.lower()
-
-            # Check for common error patterns
-            error_patterns = [
-                "error",
-                "fatal",
-                "exception",
-                "failed",
-                "cannot",
-                "unable",
-                "connection refused",
-                "timeout",
-                "permission denied",
-            ]
-
-            warning_patterns = ["warning", "warn", "deprecated", "retry", "fallback"]
-
-            for line in result.stdout.split("\n")[-50:]:  # Check last 50 lines
-                line_lower = line.lower()
-                line_stripped = line.strip()
-
-                if not line_stripped:  # Skip empty lines
-                    continue
+            # closing() kills and reaps the docker process if parsing raises
+            with closing(self._stream_container_logs(container_name)) as lines:
+                for line in lines:
+                    line_stripped = line.strip()
 
-                # Check for errors first (higher priority)
-                error_found = False
-                for pattern in error_patterns:
-                    if pattern in line_lower:
-                        if line_stripped not in analysis["errors"]:  # Avoid duplicates
+                    if not line_stripped:  # Skip empty lines
+                        continue
+
+                    # Check for errors first (higher priority)
+                    if _LOG_ERROR_RE.search(line_stripped):
+                        if line_stripped not in analysis["errors"]:  # No duplicates
                             analysis["errors"].append(line_stripped)
                         analysis["healthy"] = False
-                        error_found = True
-                        break
-
-                # Only check for warnings if no error was found in this line
-                if not error_found:
-                    for pattern in warning_patterns:
-                        if pattern in line_lower:
-                            if (
-                                line_stripped not in analysis["warnings"]
-                            ):  # Avoid duplicates
-                                analysis["warnings"].append(line_stripped)
-                            break
+                    elif _LOG_WARNING_RE.search(line_stripped):
+                        if line_stripped not in analysis["warnings"]:  # No duplicates
+                            analysis["warnings"].append(line_stripped)
 
         except Exception as e:
             analysis["errors"].append(f"Log analysis failed: {str(e)}")
@@ -516,15 +696,16 @@ class ServiceHealthChecker:
 
         return analysis
 
-    def _test_port_accessibility(self, host: str, port: int, timeout: int = 5) -> bool:
+    def _test_port_accessibility(
+        self, host: str, port: int, timeout: float = 0.5
+    ) -> bool:
         """Test if a port is accessible."""
+        import socket
+
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            result = sock.connect_ex((host, port))
-            sock.close()
-            return result == 0
-        except:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
             return False
 
     def _test_vpn_ip_change(self) -> Dict[str, Any]:
@@ -537,12 +718,10 @@ class ServiceHealthChecker:
         }
 
         try:
-            # Get local IP
-            local_result = run_command(
-                ["curl", "-s", "--max-time", "10", "ifconfig.me"], check=False
-            )
-            if local_result.returncode == 0:
-                result["local_ip"] = local_result.stdout.strip()
+            # Get local IP (in-process; it rarely changes within a run)
+            if self._local_ip_cache is None:
+                self._local_ip_cache = self._fetch_ip_via_http(PUBLIC_IP_URL)
+            result["local_ip"] = self._local_ip_cache
 
             # Get VPN IP through Gluetun
             vpn_result = run_command(
@@ -568,33 +747,41 @@ class ServiceHealthChecker:
 
         return result
 
+    def _fetch_ip_via_http(self, url: str, timeout: float = 3) -> Optional[str]:
+        """Fetch a plain-text IP address from an HTTPS endpoint."""
+        import http.client
+
+        parsed = urlparse(url)
+        conn = http.client.HTTPSConnection(parsed.netloc, timeout=timeout)
+        try:
+            conn.request("GET", parsed.path or "/")
+            response = conn.getresponse()
+            if response.status != 200:
+                return None
+            return response.read().decode().strip() or None
+        except (OSError, http.client.HTTPException):
+            return None
+        finally:
+            conn.close()
+
     def _determine_overall_status(self, results: Dict[str, Any]) -> str:
         """Determine overall health status from all check results."""
-        critical_issues = 0
-        warnings = 0
-
         # Check Docker health
         if not results["docker_health"].get("daemon_running", False):
-            critical_issues += 1
+            return "critical"
 
-        # Check service health
-        for service_health in results["services"].values():
-            if not service_health.get("container_running", False):
-                critical_issues += 1
-            elif service_health.get("issues", []):
-                warnings += len(service_health["issues"])
+        # Check service health, stopping at the first stopped container
+        services = results["services"].values()
+        if any(not health.get("container_running", False) for health in services):
+            return "critical"
 
         # Check VPN if present
         vpn_status = results.get("vpn_status", {})
         if vpn_status and not vpn_status.get("vpn_connected", True):
-            critical_issues += 1
-
-        if critical_issues > 0:
             return "critical"
-        elif warnings > 3:
-            return "warning"
-        else:
-            return "healthy"
+
+        warnings = sum(len(health.get("issues", [])) for health in services)
+        return "warning" if warnings > 3 else "healthy"
 
     def _print_health_summary(self, results: Dict[str, Any]) -> None:
         """Print a comprehensive health summary."""
@@ -709,9 +896,25 @@ class ServiceHealthChecker:
         return {"dns_leak": False, "ipv6_leak": False}
 
     def _get_container_resource_usage(self, service: str) -> Dict[str, Any]:
-        """Get container resource usage statistics."""
-        # Implementation for resource usage stats
-        return {"cpu_percent": 0, "memory_usage": 0}
+        """Get container resource usage statistics.
+
+        memory_usage is the container's memory use in bytes. The underlying
+        docker stats query blocks for a second or two, so it runs at most once
+        per CONTAINER_STATS_TTL for all containers.
+        """
+        stats = self._get_container_stats().get(service)
+        if not stats:
+            return {"cpu_percent": 0, "memory_usage": 0}
+
+        try:
+            return {
+                "cpu_percent": float(stats.get("CPUPerc", "0").rstrip("%") or 0),
+                "memory_usage": _parse_docker_size(
+                    stats.get("MemUsage", "").split("/")[0]
+                ),
+            }
+        except ValueError:
+            return {"cpu_percent": 0, "memory_usage": 0}
 
     def export_health_report(self, output_file: Path) -> None:
         """Export detailed health report to file."""
@@ -720,8 +923,17 @@ class ServiceHealthChecker:
             return
 
         try:
-            with open(output_file, "w") as f:
-                json.dump(self.health_results, f, indent=2, default=str)
+            if orjson is not None:
+                data = orjson.dumps(
+                    self.health_results,
+                    default=str,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                )
+                with open(output_file, "wb") as f:
+                    f.write(data)
+            else:
+                with open(output_file, "w") as f:
+                    json.dump(self.health_results, f, indent=2, default=str)
             print_success(f"Health report exported to: {output_file}")
         except Exception as e:
             print_error(f"Failed to export health report: {str(e)}")
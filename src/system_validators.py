@@ -201,7 +201,7 @@ class ContainerTester:
     @staticmethod
     def _wait_for_container_ready(container_name: str, timeout: int) -> bool:
         """Wait for container to be ready by checking its logs for success indicators."""
-        start_time = time.time()
+        start_time = time.monotonic()
 
         # Keywords that indicate Gluetun is ready
         ready_keywords = ["VPN is up", "Tunnel is up", "Connected", "ready", "SUCCESS"]
@@ -213,7 +213,7 @@ class ContainerTester:
             "connection failed",
         ]
 
-        while time.time() - start_time < timeout:
+        while time.monotonic() - start_time < timeout:
             try:
                 # Check logs for ready/error indicators
                 result = subprocess.run(
@@ -53,6 +53,7 @@ class ServiceSelector:
         self._show_selection_summary()
 
         if not prompt_yes_no("Continue with these services?", default=True):
+            self.selected_services = []
             return self.select_services()  # Start over
 
         return self.selected_services
@@ -2,12 +2,16 @@
 Pytest configuration and shared fixtures for media-server-automatorr tests.
 """
 
+import copy
 import os
 import shutil
+import subprocess
 import tempfile
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Dict, Generator
-from unittest.mock import MagicMock, patch
+from types import MappingProxyType
+from typing import Generator, Mapping
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
@@ -19,6 +23,12 @@ def temp_dir() -> Generator[Path, None, None]:
         yield Path(temp_dir)
 
 
+@pytest.fixture(scope="session")
+def shared_temp_dir(tmp_path_factory) -> Path:
+    """Session temporary directory for tests that never touch its contents."""
+    return tmp_path_factory.mktemp("shared")
+
+
 @pytest.fixture
 def mock_docker_dir(temp_dir: Path) -> Path:
     """Create a mock Docker directory structure."""
@@ -51,58 +61,114 @@ def mock_media_dir(temp_dir: Path) -> Path:
     return media_dir
 
 
-@pytest.fixture
-def sample_services() -> Dict:
-    """Return sample service definitions for testing."""
-    return {
-        "jellyfin": {
-            "name": "Jellyfin",
-            "description": "Free media server",
-            "category": "media_servers",
-            "image": "jellyfin/jellyfin:latest",
-            "port": 8096,
-            "volumes": {"/config": "config"},
-            "media_volumes": {"/media": "."},
-            "env": ["PUID", "PGID", "TZ"],
-            "setup_steps": ["Open web interface", "Complete setup wizard"],
-        },
-        "qbittorrent": {
-            "name": "qBittorrent",
-            "description": "Torrent client",
-            "category": "download_clients",
-            "image": "lscr.io/linuxserver/qbittorrent:latest",
-            "port": 8080,
-            "extra_ports": [6881],
-            "volumes": {"/config": "config"},
-            "media_volumes": {"/downloads": "downloads"},
-            "env": ["PUID", "PGID", "TZ"],
-            "setup_steps": [
-                "Get initial password from logs",
-                "Configure downloads path",
-            ],
-        },
-        "gluetun": {
-            "name": "Gluetun",
-            "description": "VPN client container",
-            "category": "utility",
-            "image": "qmcgaw/gluetun:latest",
-            "port": 8888,
-            "extra_ports": [8388],
-            "volumes": {"/gluetun": "config"},
-            "env": ["TZ"],
-            "setup_steps": ["Check VPN connection", "Verify routing"],
-        },
-    }
+def _freeze(value):
+    """Recursively wrap dicts in MappingProxyType and turn lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@pytest.fixture(scope="session")
+def sample_services() -> Mapping:
+    """Return read-only sample service definitions shared across the session."""
+    return _freeze(
+        {
+            "jellyfin": {
+                "name": "Jellyfin",
+                "description": "Free media server",
+                "category": "media_servers",
+                "image": "jellyfin/jellyfin:latest",
+                "port": 8096,
+                "volumes": {"/config": "config"},
+                "media_volumes": {"/media": "."},
+                "env": ["PUID", "PGID", "TZ"],
+                "setup_steps": ["Open web interface", "Complete setup wizard"],
+            },
+            "qbittorrent": {
+                "name": "qBittorrent",
+                "description": "Torrent client",
+                "category": "download_clients",
+                "image": "lscr.io/linuxserver/qbittorrent:latest",
+                "port": 8080,
+                "extra_ports": [6881],
+                "volumes": {"/config": "config"},
+                "media_volumes": {"/downloads": "downloads"},
+                "env": ["PUID", "PGID", "TZ"],
+                "setup_steps": [
+                    "Get initial password from logs",
+                    "Configure downloads path",
+                ],
+            },
+            "gluetun": {
+                "name": "Gluetun",
+                "description": "VPN client container",
+                "category": "utility",
+                "image": "qmcgaw/gluetun:latest",
+                "port": 8888,
+                "extra_ports": [8388],
+                "volumes": {"/gluetun": "config"},
+                "env": ["TZ"],
+                "setup_steps": ["Check VPN connection", "Verify routing"],
+            },
+        }
+    )
+
+
+@pytest.fixture(scope="session")
+def sample_categories() -> Mapping:
+    """Return read-only sample category definitions shared across the session."""
+    return MappingProxyType(
+        {
+            "media_servers": "Media Servers",
+            "download_clients": "Download Clients",
+            "utility": "Utility Services",
+        }
+    )
+
+
+@pytest.fixture(scope="session")
+def jellyfin_services() -> Mapping:
+    """Return read-only Jellyfin and qBittorrent definitions shared per session."""
+    return MappingProxyType(
+        {
+            "jellyfin": MappingProxyType(
+                {
+                    "name": "Jellyfin",
+                    "port": 8096,
+                    "setup_steps": ("Open web interface", "Complete setup"),
+                }
+            ),
+            "qbittorrent": MappingProxyType(
+                {
+                    "name": "qBittorrent",
+                    "port": 8080,
+                    "setup_steps": ("Get password from logs",),
+                }
+            ),
+        }
+    )
+
+
+@pytest.fixture(scope="session")
+def setup_cls():
+    """Import MediaServerSetup only when a selected test needs it."""
+    from src.setup_core import MediaServerSetup
+
+    return MediaServerSetup
+
+
+@pytest.fixture(scope="session")
+def _setup_prototype(setup_cls):
+    """Build a single MediaServerSetup per session for tests to copy."""
+    return setup_cls()
 
 
 @pytest.fixture
-def sample_categories() -> Dict:
-    """Return sample category definitions for testing."""
-    return {
-        "media_servers": "Media Servers",
-        "download_clients": "Download Clients",
-        "utility": "Utility Services",
-    }
+def setup(_setup_prototype):
+    """Return an independent copy of the session MediaServerSetup."""
+    return copy.deepcopy(_setup_prototype)
 
 
 @pytest.fixture
@@ -116,6 +182,42 @@ def mock_subprocess():
         yield mock_run
 
 
+class FakeProcess:
+    """Stand-in for subprocess.run or run_command keyed on command prefixes.
+
+    The most recent matching registration wins; registering the empty prefix
+    sets a fallback for every other command. Unmatched commands raise
+    FileNotFoundError as a missing executable would.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self._responses = []
+
+    def register(self, prefix, stdout="", returncode=0, stderr="", error=None):
+        """Register a result (or exception) for commands starting with prefix."""
+        result = subprocess.CompletedProcess(list(prefix), returncode, stdout, stderr)
+        # Later registrations take precedence over the canned defaults
+        self._responses.insert(0, (tuple(prefix), result, error))
+
+    def __call__(self, command, check=False, **kwargs):
+        self.calls.append(list(command))
+        for prefix, result, error in self._responses:
+            if tuple(command[: len(prefix)]) == prefix:
+                if error is not None:
+                    raise error
+                if check and result.returncode:
+                    raise subprocess.CalledProcessError(result.returncode, command)
+                return result
+        raise FileNotFoundError(command[0])
+
+
+@pytest.fixture
+def fake_process() -> FakeProcess:
+    """Return an empty FakeProcess; test modules register and install it."""
+    return FakeProcess()
+
+
 @pytest.fixture
 def mock_docker_commands(mock_subprocess):
     """Configure subprocess mock for Docker commands."""
@@ -227,23 +329,70 @@ def mock_yaml_load(templates_dir: Path):
         yield
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def gluetun_config():
-    """Create a mock Gluetun configuration for testing."""
+    """Return a configured GluetunConfigurator shared read-only per session.
+
+    Assigning an attribute raises and the credentials are a read-only
+    mapping, so no test can leak changes into the ones that follow.
+    """
     from src.vpn_config import GluetunConfigurator
 
-    config = GluetunConfigurator()
+    class FrozenGluetunConfigurator(GluetunConfigurator):
+        def __setattr__(self, name, value):
+            if getattr(self, "_frozen", False):
+                raise AttributeError(f"gluetun_config is read-only: {name}")
+            super().__setattr__(name, value)
+
+    config = FrozenGluetunConfigurator()
     config.enabled = True
     config.provider = "nordvpn"
     config.vpn_type = "openvpn"
-    config.credentials = {"OPENVPN_USER": "testuser", "OPENVPN_PASSWORD": "testpass"}
+    config.credentials = MappingProxyType(
+        {"OPENVPN_USER": "testuser", "OPENVPN_PASSWORD": "testpass"}
+    )
     config.server_countries = "Netherlands,Germany"
     config.route_qbittorrent = True
     config.docker_subnet = "172.17.0.0/16"
+    config._frozen = True
 
     return config
 
 
+@dataclass(frozen=True)
+class VpnPatches:
+    """Mocks installed over the prompts and subnet lookup used by vpn_config."""
+
+    prompt_yes_no: Mock
+    prompt: Mock
+    prompt_secret: Mock
+    get_docker_network_subnet: Mock
+
+
+@pytest.fixture
+def vpn_patches(monkeypatch) -> VpnPatches:
+    """Replace the interactive helpers imported into src.vpn_config.
+
+    The subnet lookup defaults to Docker's bridge network; tests that need a
+    different answer set its return_value.
+    """
+    from src import utils, vpn_config
+
+    # Spec against the real helpers so a misspelt attribute fails loudly
+    patches = VpnPatches(
+        prompt_yes_no=Mock(spec=utils.prompt_yes_no),
+        prompt=Mock(spec=utils.prompt),
+        prompt_secret=Mock(spec=utils.prompt_secret),
+        get_docker_network_subnet=Mock(
+            spec=utils.get_docker_network_subnet, return_value="172.17.0.0/16"
+        ),
+    )
+    for field in fields(patches):
+        mock = getattr(patches, field.name)
+        monkeypatch.setattr(vpn_config, field.name, mock)
+    return patches
+
+
 @pytest.fixture
 def mock_container_operations():
     """Mock Docker container operations."""
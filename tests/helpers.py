@@ -0,0 +1,14 @@
+"""
+Shared helpers for the media-server-automatorr tests.
+"""
+
+from contextlib import redirect_stdout
+from io import StringIO
+
+
+def stdout_of(func, *args, **kwargs):
+    """Call func and return what it printed to stdout."""
+    buf = StringIO()
+    with redirect_stdout(buf):
+        func(*args, **kwargs)
+    return buf.getvalue()
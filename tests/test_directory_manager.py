@@ -291,6 +291,54 @@ class TestDirectoryManager:
         assert "permissions" in info
         assert info["file_count"] >= 2
 
+    def test_get_directory_info_nested(self, temp_dir):
+        """Test directory information counts nested entries and sizes."""
+        manager = DirectoryManager()
+        test_dir = temp_dir / "test_directory"
+        (test_dir / "sub").mkdir(parents=True)
+        (test_dir / "file1.txt").write_bytes(b"a" * 1024)
+        (test_dir / "sub" / "file2.txt").write_bytes(b"b" * 1024)
+
+        info = manager.get_directory_info(test_dir)
+
+        assert info["file_count"] == 3  # file1.txt, sub, sub/file2.txt
+        assert info["size_mb"] == 2048 / (1024 * 1024)
+
+    def test_get_directory_info_skips_unreadable_subdirectory(self, temp_dir):
+        """Test an unreadable subdirectory is skipped rather than failing the scan."""
+        manager = DirectoryManager()
+        test_dir = temp_dir / "test_directory"
+        (test_dir / "locked").mkdir(parents=True)
+        (test_dir / "file1.txt").write_bytes(b"a" * 1024)
+        (test_dir / "locked" / "hidden.txt").write_bytes(b"b" * 1024)
+        real_scandir = os.scandir
+
+        def scandir(path):
+            if os.path.basename(path) == "locked":
+                raise PermissionError(13, "Permission denied", path)
+            return real_scandir(path)
+
+        with patch("src.directory_manager.os.scandir", side_effect=scandir):
+            info = manager.get_directory_info(test_dir)
+
+        assert "error" not in info
+        assert info["file_count"] == 2  # file1.txt, locked
+        assert info["size_mb"] == 1024 / (1024 * 1024)
+
+    def test_get_directory_info_symlinked_file(self, temp_dir):
+        """Test a symlink to a file counts its target's size."""
+        manager = DirectoryManager()
+        target = temp_dir / "target.bin"
+        target.write_bytes(b"a" * 2048)
+        test_dir = temp_dir / "test_directory"
+        test_dir.mkdir()
+        (test_dir / "link.bin").symlink_to(target)
+
+        info = manager.get_directory_info(test_dir)
+
+        assert info["file_count"] == 1
+        assert info["size_mb"] == 2048 / (1024 * 1024)
+
     def test_get_directory_info_not_exists(self, temp_dir):
         """Test getting directory information for non-existent directory."""
         manager = DirectoryManager()
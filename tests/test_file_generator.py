@@ -2,17 +2,21 @@
 Tests for file_generator module.
 """
 
-import os
-import tempfile
 from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+from typing import Dict
+from unittest.mock import Mock, patch
 
 import pytest
-import yaml
 
 from src.file_generator import FileGenerator
 
 
+def _write_files(directory: Path, files: Dict[str, str]) -> None:
+    """Write pre-encoded test files into a directory."""
+    for name, content in files.items():
+        (directory / name).write_bytes(content.encode())
+
+
 class TestFileGenerator:
     """Test FileGenerator class."""
 
@@ -206,29 +210,29 @@ class TestFileGenerator:
         assert any("Testing VPN Connection:" in line for line in lines)
         assert any("gluetun" in line for line in lines)
 
-    def test_generate_troubleshooting_section_basic(self):
-        """Test troubleshooting section generation."""
-        mock_loader = Mock()
-        generator = FileGenerator(mock_loader)
-
-        lines = generator._generate_troubleshooting_section(["jellyfin"])
-
-        assert any("Troubleshooting" in line for line in lines)
-        assert any("Common Issues" in line for line in lines)
-        assert any("Can't access web interfaces" in line for line in lines)
-
-    def test_generate_troubleshooting_section_with_services(self):
-        """Test troubleshooting section with specific services."""
+    @pytest.mark.parametrize(
+        "services, expected",
+        [
+            (
+                ["jellyfin"],
+                ["Troubleshooting", "Common Issues", "Can't access web interfaces"],
+            ),
+            (
+                ["qbittorrent", "sonarr", "gluetun"],
+                ["qBittorrent Issues:", "*arr App Issues:", "VPN (Gluetun) Issues:"],
+            ),
+        ],
+    )
+    def test_generate_troubleshooting_section(self, services, expected):
+        """Test troubleshooting section generation for different services."""
         mock_loader = Mock()
         generator = FileGenerator(mock_loader)
 
-        lines = generator._generate_troubleshooting_section(
-            ["qbittorrent", "sonarr", "gluetun"]
-        )
+        lines = generator._generate_troubleshooting_section(services)
 
-        assert any("qBittorrent Issues:" in line for line in lines)
-        assert any("*arr App Issues:" in line for line in lines)
-        assert any("VPN (Gluetun) Issues:" in line for line in lines)
+        text = "\n".join(lines)
+        for needle in expected:
+            assert needle in text
 
     def test_set_file_permissions_success(self, temp_dir):
         """Test successful file permissions setting."""
@@ -339,9 +343,14 @@ class TestFileGenerator:
         generator = FileGenerator(mock_loader)
 
         # Create required files with valid content
-        (temp_dir / "docker-compose.yml").write_text("version: '3.8'\nservices: {}")
-        (temp_dir / ".env").write_text("TZ=UTC")
-        (temp_dir / "SETUP_GUIDE.md").write_text("# Setup Guide")
+        _write_files(
+            temp_dir,
+            {
+                "docker-compose.yml": "version: '3.8'\nservices: {}",
+                ".env": "TZ=UTC",
+                "SETUP_GUIDE.md": "# Setup Guide",
+            },
+        )
 
         errors = generator.validate_generated_files(temp_dir)
 
@@ -368,9 +377,9 @@ class TestFileGenerator:
         generator = FileGenerator(mock_loader)
 
         # Create empty files
-        (temp_dir / "docker-compose.yml").write_text("")
-        (temp_dir / ".env").write_text("")
-        (temp_dir / "SETUP_GUIDE.md").write_text("")
+        _write_files(
+            temp_dir, {"docker-compose.yml": "", ".env": "", "SETUP_GUIDE.md": ""}
+        )
 
         errors = generator.validate_generated_files(temp_dir)
 
@@ -385,9 +394,14 @@ class TestFileGenerator:
         generator = FileGenerator(mock_loader)
 
         # Create files with valid content except for invalid YAML
-        (temp_dir / "docker-compose.yml").write_text("invalid: yaml: content:")
-        (temp_dir / ".env").write_text("TZ=UTC")
-        (temp_dir / "SETUP_GUIDE.md").write_text("# Setup Guide")
+        _write_files(
+            temp_dir,
+            {
+                "docker-compose.yml": "invalid: yaml: content:",
+                ".env": "TZ=UTC",
+                "SETUP_GUIDE.md": "# Setup Guide",
+            },
+        )
 
         errors = generator.validate_generated_files(temp_dir)
 
@@ -400,9 +414,14 @@ class TestFileGenerator:
         generator = FileGenerator(mock_loader)
 
         # Create files
-        (temp_dir / "docker-compose.yml").write_text("version: '3.8'")
-        (temp_dir / ".env").write_text("TZ=UTC")
-        (temp_dir / "SETUP_GUIDE.md").write_text("# Setup Guide")
+        _write_files(
+            temp_dir,
+            {
+                "docker-compose.yml": "version: '3.8'",
+                ".env": "TZ=UTC",
+                "SETUP_GUIDE.md": "# Setup Guide",
+            },
+        )
 
         # Mock open to fail for compose file
         original_open = open
@@ -9,45 +9,48 @@ Tests comprehensive service health checking including:
 - Security checks
 """
 
+import io
 import json
+import os
+import shutil
 import socket
+import subprocess
 import tempfile
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from unittest.mock import MagicMock, Mock, call, patch
+from types import MappingProxyType
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.health_checker import ServiceHealthChecker
-
-
-class TestServiceHealthChecker:
-    """Test ServiceHealthChecker class."""
-
-    @pytest.fixture
-    def health_checker(self, temp_dir):
-        """Create a ServiceHealthChecker instance for testing."""
-        docker_dir = temp_dir / "docker"
-        media_dir = temp_dir / "media"
-        docker_dir.mkdir()
-        media_dir.mkdir()
-
-        checker = ServiceHealthChecker(docker_dir, media_dir)
-        return checker
-
-    @pytest.fixture
-    def mock_services_config(self):
-        """Mock services configuration."""
-        return {
-            "jellyfin": {
+from src.health_checker import (
+    CONTAINER_SNAPSHOT_TTL,
+    ServiceHealthChecker,
+    _now_iso,
+)
+
+# Lightweight stand-in for subprocess.CompletedProcess in command mocks
+CompletedStub = namedtuple(
+    "CompletedStub", "returncode stdout stderr", defaults=("", "")
+)
+
+# Read-only service definitions shared by every health checker test
+_FROZEN_SERVICES = MappingProxyType(
+    {
+        "jellyfin": MappingProxyType(
+            {
                 "name": "Jellyfin",
                 "port": 8096,
                 "volumes": {"/config": "config"},
                 "media_volumes": {"/media": "."},
                 "env": ["PUID", "PGID", "TZ"],
                 "setup_url": "http://{host_ip}:8096",
-            },
-            "qbittorrent": {
+            }
+        ),
+        "qbittorrent": MappingProxyType(
+            {
                 "name": "qBittorrent",
                 "port": 8080,
                 "extra_ports": [6881],
@@ -55,17 +58,126 @@ class TestServiceHealthChecker:
                 "media_volumes": {"/downloads": "downloads"},
                 "env": ["PUID", "PGID", "TZ"],
                 "setup_url": "http://{host_ip}:8080",
-            },
-            "gluetun": {
+            }
+        ),
+        "gluetun": MappingProxyType(
+            {
                 "name": "Gluetun",
                 "port": 8888,
                 "extra_ports": [8388],
                 "volumes": {"/gluetun": "config"},
                 "env": ["TZ"],
                 "setup_url": None,
-            },
+            }
+        ),
+    }
+)
+
+
+# Container listing commands issued by the health checker
+DOCKER_PS = ["docker", "ps", "-a", "--format", "{{json .}}"]
+DOCKER_STATS = ["docker", "stats", "--no-stream", "--format", "{{json .}}"]
+
+
+def _json_lines(*entries):
+    """Render entries as docker's one-JSON-object-per-line output."""
+    return "".join(json.dumps(entry) + "\n" for entry in entries)
+
+
+class FakePopen:
+    """Stand-in for a docker logs process whose stdout serves canned lines."""
+
+    def __init__(self, output, finished=True):
+        self.stdout = io.StringIO(output)
+        self.returncode = 0 if finished else None
+        self.args = None
+        self.killed = False
+        self.waited = False
+
+    def __call__(self, args, **kwargs):
+        self.args = args
+        return self
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+    def wait(self):
+        self.waited = True
+        return self.returncode
+
+
+@pytest.fixture
+def fake_commands(fake_process):
+    """Route health checker commands through the shared FakeProcess registry."""
+    # Commands nobody registered fail the way a missing container would
+    fake_process.register([], returncode=1)
+    with patch("src.health_checker.run_command", fake_process):
+        yield fake_process
+
+
+@pytest.fixture(scope="module")
+def mock_services_config():
+    """Mock services configuration (read-only, shared across tests)."""
+    return _FROZEN_SERVICES
+
+
+@pytest.fixture(scope="class")
+def no_external_calls():
+    """Stub out docker and HTTP access once for a whole test class."""
+
+    def failing_command(command, check=True, sudo=False):
+        return subprocess.CompletedProcess(command, 1, "", "")
+
+    def refused_connection(*args, **kwargs):
+        raise ConnectionRefusedError("network disabled in tests")
+
+    with patch("src.health_checker.run_command", failing_command), patch(
+        "src.health_checker.urlopen", refused_connection
+    ), patch("http.client.HTTPSConnection", refused_connection), patch.object(
+        ServiceHealthChecker, "_stream_container_logs", lambda *_: iter(())
+    ):
+        yield
+
+
+@pytest.mark.usefixtures("no_external_calls")
+class TestServiceHealthChecker:
+    """Test ServiceHealthChecker class."""
+
+    @pytest.fixture
+    def health_checker(self, temp_dir):
+        """Create a ServiceHealthChecker instance for testing."""
+        docker_dir = temp_dir / "docker"
+        media_dir = temp_dir / "media"
+        docker_dir.mkdir()
+        media_dir.mkdir()
+
+        checker = ServiceHealthChecker(docker_dir, media_dir)
+        return checker
+
+    @pytest.fixture
+    def stub_checker(self, health_checker, mock_services_config):
+        """Return a factory for a checker whose per-service probes are stubbed."""
+        health_checker.load_service_config(mock_services_config)
+        healthy_probes = {
+            "_is_container_running": True,
+            "_check_container_health_status": True,
+            "_check_service_ports": {"main_8096": True},
+            "_check_web_ui_health": True,
+            "_analyze_container_logs": {"healthy": True, "errors": [], "warnings": []},
+            "_get_container_resource_usage": {"cpu_percent": 5.2, "memory_usage": 512},
         }
 
+        def make(**overrides):
+            for name, value in {**healthy_probes, **overrides}.items():
+                setattr(health_checker, name, lambda *_, value=value: value)
+            return health_checker
+
+        return make
+
     def test_init(self, temp_dir):
         """Test ServiceHealthChecker initialization."""
         docker_dir = temp_dir / "docker"
@@ -86,23 +198,24 @@ class TestServiceHealthChecker:
         assert "jellyfin" in health_checker.services_config
         assert "qbittorrent" in health_checker.services_config
 
-    @patch("src.health_checker.run_command")
-    def test_check_docker_health_success(self, mock_run_command, health_checker):
+        # Web UI probing is only scheduled for services with a setup URL
+        probes = health_checker._service_probes
+        assert health_checker._probe_web_ui in probes["jellyfin"]
+        assert health_checker._probe_web_ui not in probes["gluetun"]
+
+    def test_check_docker_health_success(self, fake_commands, health_checker):
         """Test successful Docker health check."""
-        # Mock successful Docker commands
-        mock_run_command.side_effect = [
-            MagicMock(returncode=0, stdout="Docker info output"),  # docker info
-            MagicMock(
-                returncode=0, stdout="Docker Compose version"
-            ),  # docker compose version
-            MagicMock(
-                returncode=0, stdout="TYPE     SIZE\nImages   1.2GB"
-            ),  # docker system df
-            MagicMock(
-                returncode=0,
-                stdout="NETWORK ID   NAME\n123abc   bridge\n456def   media-network",
-            ),  # docker network ls
-        ]
+        fake_commands.register(["docker", "info"], stdout="Docker info output")
+        fake_commands.register(
+            ["docker", "compose", "version"], stdout="Docker Compose version"
+        )
+        fake_commands.register(
+            ["docker", "system", "df"], stdout="TYPE     SIZE\nImages   1.2GB"
+        )
+        fake_commands.register(
+            ["docker", "network", "ls"],
+            stdout="NETWORK ID   NAME\n123abc   bridge\n456def   media-network",
+        )
 
         health = health_checker._check_docker_health()
 
@@ -111,46 +224,38 @@ class TestServiceHealthChecker:
         assert "available_networks" in health["network_status"]
         assert health["network_status"]["media_network_exists"] is True
         assert len(health["issues"]) == 0
+        assert len(fake_commands.calls) == 4
 
     @patch("src.health_checker.run_command")
     def test_check_docker_health_failure(self, mock_run_command, health_checker):
         """Test Docker health check with daemon failure."""
-        mock_run_command.return_value = MagicMock(returncode=1)
+        mock_run_command.return_value = CompletedStub(returncode=1)
 
         health = health_checker._check_docker_health()
 
         assert health["daemon_running"] is False
         assert "Docker daemon not responding" in health["issues"]
 
-    @patch.object(ServiceHealthChecker, "_is_container_running")
-    @patch.object(ServiceHealthChecker, "_check_container_health_status")
-    @patch.object(ServiceHealthChecker, "_check_service_ports")
-    @patch.object(ServiceHealthChecker, "_check_web_ui_health")
-    @patch.object(ServiceHealthChecker, "_analyze_container_logs")
-    @patch.object(ServiceHealthChecker, "_get_container_resource_usage")
-    def test_check_service_health_success(
-        self,
-        mock_resource_usage,
-        mock_logs,
-        mock_web_ui,
-        mock_ports,
-        mock_health_status,
-        mock_running,
-        health_checker,
-        mock_services_config,
-    ):
-        """Test successful service health check."""
-        health_checker.load_service_config(mock_services_config)
+    @patch("src.health_checker.run_command")
+    def test_check_docker_health_uses_cache(self, mock_run_command, health_checker):
+        """Test Docker daemon queries are reused until the cache is invalidated."""
+        mock_run_command.return_value = CompletedStub(
+            returncode=0, stdout="NETWORK ID   NAME\n123abc   bridge"
+        )
 
-        # Mock all checks as successful
-        mock_running.return_value = True
-        mock_health_status.return_value = True
-        mock_ports.return_value = {"main_8096": True}
-        mock_web_ui.return_value = True
-        mock_logs.return_value = {"healthy": True, "errors": [], "warnings": []}
-        mock_resource_usage.return_value = {"cpu_percent": 5.2, "memory_usage": 512}
+        health_checker._check_docker_health()
+        health_checker._check_docker_health()
+        assert mock_run_command.call_count == 4
 
-        health = health_checker._check_service_health("jellyfin")
+        health_checker.invalidate_docker_cache()
+        health_checker._check_docker_health()
+        assert mock_run_command.call_count == 8
+
+    def test_check_service_health_success(self, stub_checker):
+        """Test successful service health check."""
+        checker = stub_checker()
+
+        health = checker._check_service_health("jellyfin")
 
         assert health["container_running"] is True
         assert health["container_healthy"] is True
@@ -159,74 +264,165 @@ class TestServiceHealthChecker:
         assert health["logs_healthy"] is True
         assert len(health["issues"]) == 0
 
-    @patch.object(ServiceHealthChecker, "_is_container_running")
-    def test_check_service_health_container_not_running(
-        self, mock_running, health_checker, mock_services_config
-    ):
+    def test_check_service_health_container_not_running(self, stub_checker):
         """Test service health check when container is not running."""
-        health_checker.load_service_config(mock_services_config)
-        mock_running.return_value = False
+        checker = stub_checker(_is_container_running=False)
 
-        health = health_checker._check_service_health("jellyfin")
+        health = checker._check_service_health("jellyfin")
 
         assert health["container_running"] is False
         assert "Container jellyfin is not running" in health["issues"]
 
-    @patch("src.health_checker.run_command")
-    def test_is_container_running_true(self, mock_run_command, health_checker):
+    def test_is_container_running_true(self, fake_commands, health_checker):
         """Test container running detection when container is running."""
-        mock_run_command.return_value = MagicMock(returncode=0, stdout="jellyfin")
+        fake_commands.register(
+            DOCKER_PS, stdout=_json_lines({"Names": "jellyfin", "State": "running"})
+        )
 
         result = health_checker._is_container_running("jellyfin")
         assert result is True
 
-    @patch("src.health_checker.run_command")
-    def test_is_container_running_false(self, mock_run_command, health_checker):
+    def test_is_container_running_false(self, fake_commands, health_checker):
         """Test container running detection when container is not running."""
-        mock_run_command.return_value = MagicMock(returncode=0, stdout="")
-
-        result = health_checker._is_container_running("jellyfin")
-        assert result is False
+        fake_commands.register(
+            DOCKER_PS, stdout=_json_lines({"Names": "jellyfin", "State": "exited"})
+        )
 
-    @patch("src.health_checker.run_command")
-    def test_check_container_health_status_healthy(
-        self, mock_run_command, health_checker
+        assert health_checker._is_container_running("jellyfin") is False
+        assert health_checker._is_container_running("sonarr") is False
+
+    @pytest.mark.parametrize(
+        "status,expected",
+        [
+            ("Up 2 hours (healthy)", True),
+            ("Up 2 hours", True),  # No healthcheck defined is considered OK
+            ("Up 2 hours (unhealthy)", False),
+        ],
+        ids=["healthy", "no_healthcheck", "unhealthy"],
+    )
+    def test_check_container_health_status(
+        self, fake_commands, health_checker, status, expected
     ):
-        """Test container health status check when healthy."""
-        mock_run_command.return_value = MagicMock(returncode=0, stdout="healthy")
+        """Test container health status is read from the docker ps status."""
+        fake_commands.register(
+            DOCKER_PS,
+            stdout=_json_lines(
+                {"Names": "jellyfin", "State": "running", "Status": status}
+            ),
+        )
 
         result = health_checker._check_container_health_status("jellyfin")
-        assert result is True
+        assert result is expected
+
+    def test_refresh_container_snapshot(self, fake_commands, health_checker):
+        """Test container state is loaded with one docker ps call."""
+        fake_commands.register(
+            DOCKER_PS,
+            stdout=_json_lines(
+                {"Names": "jellyfin", "State": "running", "Status": "Up"},
+                {"Names": "sonarr", "State": "exited", "Status": "Exited"},
+            ),
+        )
 
-    @patch("src.health_checker.run_command")
-    def test_check_container_health_status_no_healthcheck(
-        self, mock_run_command, health_checker
+        health_checker._refresh_container_snapshot()
+
+        assert health_checker._is_container_running("jellyfin") is True
+        assert health_checker._is_container_running("sonarr") is False
+        assert fake_commands.calls == [DOCKER_PS]
+
+    def test_container_snapshot_expires(self, fake_commands, health_checker):
+        """Test direct reads re-query docker ps once the snapshot is stale."""
+        clock = [100.0]
+        fake_commands.register(
+            DOCKER_PS, stdout=_json_lines({"Names": "jellyfin", "State": "running"})
+        )
+
+        with patch("src.health_checker.time.monotonic", lambda: clock[0]):
+            assert health_checker._is_container_running("jellyfin") is True
+            fake_commands.register(
+                DOCKER_PS, stdout=_json_lines({"Names": "jellyfin", "State": "exited"})
+            )
+            assert health_checker._is_container_running("jellyfin") is True
+
+            clock[0] += CONTAINER_SNAPSHOT_TTL
+            assert health_checker._is_container_running("jellyfin") is False
+
+        assert fake_commands.calls == [DOCKER_PS, DOCKER_PS]
+
+    def test_stale_snapshot_refreshed_once_across_threads(self, health_checker):
+        """Test threads that find the snapshot stale share a single docker ps."""
+        calls = []
+
+        def slow_docker_ps(command, check=True, sudo=False):
+            calls.append(command)
+            time.sleep(0.05)  # Hold the lock while the other threads queue
+            return subprocess.CompletedProcess(
+                command, 0, _json_lines({"Names": "jellyfin", "State": "running"}), ""
+            )
+
+        with patch("src.health_checker.run_command", slow_docker_ps):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                running = list(
+                    executor.map(health_checker._is_container_running, ["jellyfin"] * 4)
+                )
+
+        assert running == [True] * 4
+        assert calls == [DOCKER_PS]
+
+    def test_container_stats_fetched_lazily(self, fake_commands, health_checker):
+        """Test docker stats only runs when resource usage is read, then is reused."""
+        fake_commands.register(
+            DOCKER_PS, stdout=_json_lines({"Names": "jellyfin", "State": "running"})
+        )
+        fake_commands.register(
+            DOCKER_STATS,
+            stdout=_json_lines(
+                {
+                    "Name": "jellyfin",
+                    "CPUPerc": "5.20%",
+                    "MemPerc": "1.50%",
+                    "MemUsage": "512MiB / 32GiB",
+                }
+            ),
+        )
+
+        health_checker._refresh_container_snapshot()
+        assert DOCKER_STATS not in fake_commands.calls
+
+        usage = health_checker._get_container_resource_usage("jellyfin")
+        health_checker._get_container_resource_usage("sonarr")
+
+        assert usage["cpu_percent"] == 5.2
+        assert usage == {"cpu_percent": 5.2, "memory_usage": 512 * 1024**2}
+        assert fake_commands.calls.count(DOCKER_STATS) == 1
+
+    def test_container_stats_malformed_output(
+        self, fake_commands, health_checker, capsys
     ):
-        """Test container health status when no healthcheck is defined."""
-        mock_run_command.return_value = MagicMock(returncode=0, stdout="")
+        """Test unreadable docker stats output is reported and yields no data."""
+        fake_commands.register(DOCKER_STATS, stdout="not json\n")
 
-        result = health_checker._check_container_health_status("jellyfin")
-        assert result is True  # No healthcheck defined is considered OK
+        usage = health_checker._get_container_resource_usage("jellyfin")
+
+        assert usage == {"cpu_percent": 0, "memory_usage": 0}
+        assert "Failed to read output of docker stats" in capsys.readouterr().out
 
     def test_test_port_accessibility_success(self, health_checker):
         """Test successful port accessibility check."""
-        with patch("socket.socket") as mock_socket:
-            mock_socket_instance = Mock()
-            mock_socket_instance.connect_ex.return_value = 0
-            mock_socket.return_value = mock_socket_instance
-
+        with patch("socket.create_connection") as mock_connect:
             result = health_checker._test_port_accessibility("localhost", 8080)
-            assert result is True
+
+        assert result is True
+        mock_connect.assert_called_once_with(("localhost", 8080), timeout=0.5)
 
     def test_test_port_accessibility_failure(self, health_checker):
         """Test failed port accessibility check."""
-        with patch("socket.socket") as mock_socket:
-            mock_socket_instance = Mock()
-            mock_socket_instance.connect_ex.return_value = 1  # Connection failed
-            mock_socket.return_value = mock_socket_instance
-
+        with patch(
+            "socket.create_connection", side_effect=ConnectionRefusedError()
+        ):  # Connection failed
             result = health_checker._test_port_accessibility("localhost", 8080)
-            assert result is False
+
+        assert result is False
 
     def test_check_service_ports(self, health_checker, mock_services_config):
         """Test service ports checking."""
@@ -249,29 +445,55 @@ class TestServiceHealthChecker:
         self, mock_urlopen, health_checker, mock_services_config
     ):
         """Test successful web UI health check."""
-        mock_response = Mock()
-        mock_response.getcode.return_value = 200
-        mock_urlopen.return_value = mock_response
+        mock_urlopen.return_value.getcode.return_value = 200
 
         result = health_checker._check_web_ui_health(
             "jellyfin", mock_services_config["jellyfin"]
         )
         assert result is True
 
+        # A second probe within the TTL is served from the cache
+        result = health_checker._check_web_ui_health(
+            "jellyfin", mock_services_config["jellyfin"]
+        )
+        assert result is True
+        mock_urlopen.assert_called_once_with("http://localhost:8096", timeout=10)
+
+        health_checker.invalidate_web_cache()
+        health_checker._check_web_ui_health(
+            "jellyfin", mock_services_config["jellyfin"]
+        )
+        assert mock_urlopen.call_count == 2
+
     @patch("src.health_checker.urlopen")
     def test_check_web_ui_health_auth_redirect(
         self, mock_urlopen, health_checker, mock_services_config
     ):
         """Test web UI health check with auth redirect."""
-        mock_response = Mock()
-        mock_response.getcode.return_value = 401  # Auth required
-        mock_urlopen.return_value = mock_response
+        mock_urlopen.return_value.getcode.return_value = 401  # Auth required
 
         result = health_checker._check_web_ui_health(
             "jellyfin", mock_services_config["jellyfin"]
         )
         assert result is True  # 401 is acceptable
 
+    @patch("src.health_checker.urlopen")
+    def test_check_web_ui_health_error_not_cached(
+        self, mock_urlopen, health_checker, mock_services_config
+    ):
+        """Test a failed probe is retried on the next check instead of cached."""
+        response = MagicMock()
+        response.getcode.return_value = 200
+        mock_urlopen.side_effect = [TimeoutError("timed out"), response]
+
+        for expected in (False, True):
+            result = health_checker._check_web_ui_health(
+                "jellyfin", mock_services_config["jellyfin"]
+            )
+            assert result is expected
+
+        assert mock_urlopen.call_count == 2
+
     @patch("src.health_checker.urlopen")
     def test_check_web_ui_health_no_url(
         self, mock_urlopen, health_checker, mock_services_config
@@ -282,12 +504,11 @@ class TestServiceHealthChecker:
         )
         assert result is True  # No URL to check is OK
 
-    @patch("src.health_checker.run_command")
-    def test_analyze_container_logs_healthy(self, mock_run_command, health_checker):
+    @patch.object(ServiceHealthChecker, "_stream_container_logs")
+    def test_analyze_container_logs_healthy(self, mock_logs, health_checker):
         """Test container log analysis with healthy logs."""
-        mock_run_command.return_value = MagicMock(
-            returncode=0,
-            stdout="INFO: Service started successfully\nDEBUG: Configuration loaded\nINFO: Ready to serve requests",
+        mock_logs.return_value = io.StringIO(
+            "INFO: Service started successfully\nDEBUG: Configuration loaded\nINFO: Ready to serve requests"
         )
 
         result = health_checker._analyze_container_logs("jellyfin")
@@ -296,12 +517,11 @@ class TestServiceHealthChecker:
         assert len(result["errors"]) == 0
         assert len(result["warnings"]) == 0
 
-    @patch("src.health_checker.run_command")
-    def test_analyze_container_logs_with_errors(self, mock_run_command, health_checker):
+    @patch.object(ServiceHealthChecker, "_stream_container_logs")
+    def test_analyze_container_logs_with_errors(self, mock_logs, health_checker):
         """Test container log analysis with errors."""
-        mock_run_command.return_value = MagicMock(
-            returncode=0,
-            stdout="INFO: Service starting\nERROR: Database connection failed\nFATAL: Cannot continue",
+        mock_logs.return_value = io.StringIO(
+            "INFO: Service starting\nERROR: Database connection failed\nFATAL: Cannot continue"
         )
 
         result = health_checker._analyze_container_logs("jellyfin")
@@ -311,14 +531,11 @@ class TestServiceHealthChecker:
         assert "ERROR: Database connection failed" in result["errors"]
         assert "FATAL: Cannot continue" in result["errors"]
 
-    @patch("src.health_checker.run_command")
-    def test_analyze_container_logs_with_warnings(
-        self, mock_run_command, health_checker
-    ):
+    @patch.object(ServiceHealthChecker, "_stream_container_logs")
+    def test_analyze_container_logs_with_warnings(self, mock_logs, health_checker):
         """Test container log analysis with warnings."""
-        mock_run_command.return_value = MagicMock(
-            returncode=0,
-            stdout="INFO: Service starting\nWARNING: Configuration file not found, using defaults\nINFO: Service ready",
+        mock_logs.return_value = io.StringIO(
+            "INFO: Service starting\nWARNING: Configuration file not found, using defaults\nINFO: Service ready"
         )
 
         result = health_checker._analyze_container_logs("jellyfin")
@@ -331,19 +548,47 @@ class TestServiceHealthChecker:
             in result["warnings"]
         )
 
+    @pytest.mark.parametrize(
+        "status,body,error,expected",
+        [
+            (200, b" 203.0.113.7\n", None, "203.0.113.7"),
+            (200, b" \n", None, None),
+            (503, b"Service Unavailable", None, None),
+            (None, b"", OSError("network unreachable"), None),
+        ],
+        ids=["ok", "blank_body", "non_200", "os_error"],
+    )
+    @patch("http.client.HTTPSConnection")
+    def test_fetch_ip_via_http(
+        self, mock_connection, health_checker, status, body, error, expected
+    ):
+        """Test the public IP lookup and that its connection is always closed."""
+        conn = mock_connection.return_value
+        conn.request.side_effect = error
+        conn.getresponse.return_value.status = status
+        conn.getresponse.return_value.read.return_value = body
+
+        result = health_checker._fetch_ip_via_http("https://ifconfig.me/ip")
+
+        assert result == expected
+        mock_connection.assert_called_once_with("ifconfig.me", timeout=3)
+        conn.request.assert_called_once_with("GET", "/ip")
+        conn.close.assert_called_once()
+
+    @patch.object(ServiceHealthChecker, "_fetch_ip_via_http")
     @patch.object(ServiceHealthChecker, "_is_container_running")
     @patch("src.health_checker.run_command")
     def test_test_vpn_ip_change_success(
-        self, mock_run_command, mock_running, health_checker
+        self, mock_run_command, mock_running, mock_fetch_ip, health_checker
     ):
         """Test successful VPN IP change detection."""
         mock_running.return_value = True
 
-        # Mock local IP and VPN IP commands
-        mock_run_command.side_effect = [
-            MagicMock(returncode=0, stdout="203.0.113.1"),  # Local IP
-            MagicMock(returncode=0, stdout="198.51.100.1"),  # VPN IP
-        ]
+        # Mock local IP lookup and VPN IP command
+        mock_fetch_ip.return_value = "203.0.113.1"
+        mock_run_command.return_value = CompletedStub(
+            returncode=0, stdout="198.51.100.1"
+        )
 
         result = health_checker._test_vpn_ip_change()
 
@@ -352,19 +597,20 @@ class TestServiceHealthChecker:
         assert result["local_ip"] == "203.0.113.1"
         assert result["external_ip"] == "198.51.100.1"
 
+    @patch.object(ServiceHealthChecker, "_fetch_ip_via_http")
     @patch.object(ServiceHealthChecker, "_is_container_running")
     @patch("src.health_checker.run_command")
     def test_test_vpn_ip_change_no_change(
-        self, mock_run_command, mock_running, health_checker
+        self, mock_run_command, mock_running, mock_fetch_ip, health_checker
     ):
         """Test VPN IP check when IP hasn't changed (VPN not working)."""
         mock_running.return_value = True
 
         # Mock same IP for both local and VPN
-        mock_run_command.side_effect = [
-            MagicMock(returncode=0, stdout="203.0.113.1"),  # Local IP
-            MagicMock(returncode=0, stdout="203.0.113.1"),  # Same IP through VPN
-        ]
+        mock_fetch_ip.return_value = "203.0.113.1"
+        mock_run_command.return_value = CompletedStub(
+            returncode=0, stdout="203.0.113.1"
+        )
 
         result = health_checker._test_vpn_ip_change()
 
@@ -373,6 +619,25 @@ class TestServiceHealthChecker:
         assert result["local_ip"] == "203.0.113.1"
         assert result["external_ip"] == "203.0.113.1"
 
+    @patch.object(ServiceHealthChecker, "_fetch_ip_via_http")
+    @patch("src.health_checker.run_command")
+    def test_test_vpn_ip_change_caches_local_ip(
+        self, mock_run_command, mock_fetch_ip, health_checker
+    ):
+        """Test the local IP is looked up once per checker."""
+        mock_fetch_ip.return_value = "203.0.113.1"
+        mock_run_command.return_value = CompletedStub(
+            returncode=0, stdout="198.51.100.1"
+        )
+
+        health_checker._test_vpn_ip_change()
+        result = health_checker._test_vpn_ip_change()
+
+        assert result["local_ip"] == "203.0.113.1"
+        mock_fetch_ip.assert_called_once()
+        assert mock_run_command.call_count == 2
+
+    @patch.object(ServiceHealthChecker, "_refresh_container_snapshot")
     @patch.object(ServiceHealthChecker, "_check_docker_health")
     @patch.object(ServiceHealthChecker, "_check_service_health")
     @patch.object(ServiceHealthChecker, "_check_network_connectivity")
@@ -387,6 +652,7 @@ class TestServiceHealthChecker:
         mock_network,
         mock_service_health,
         mock_docker_health,
+        mock_refresh,
         health_checker,
         mock_services_config,
     ):
@@ -417,7 +683,47 @@ class TestServiceHealthChecker:
         assert "services" in results
         assert len(results["services"]) == 3
         assert "vpn_status" in results
-        assert "timestamp" in results
+        assert isinstance(results["timestamp"], float)
+        assert isinstance(results["checked_at"], str)
+        assert results["duration_ms"] >= 0
+
+    @patch.object(ServiceHealthChecker, "_refresh_container_snapshot")
+    @patch.object(ServiceHealthChecker, "_check_docker_health")
+    @patch.object(ServiceHealthChecker, "_check_service_health")
+    @patch.object(ServiceHealthChecker, "_check_network_connectivity")
+    @patch.object(ServiceHealthChecker, "_check_file_permissions")
+    @patch.object(ServiceHealthChecker, "_check_environment_variables")
+    def test_check_all_services_parallel(
+        self,
+        mock_env_vars,
+        mock_file_perms,
+        mock_network,
+        mock_service_health,
+        mock_docker_health,
+        mock_refresh,
+        health_checker,
+        mock_services_config,
+    ):
+        """Test service results keep selection order regardless of finish order."""
+        health_checker.load_service_config(mock_services_config)
+        delays = {"jellyfin": 0.05, "qbittorrent": 0.02, "sonarr": 0.0}
+
+        def slow_service_health(service):
+            time.sleep(delays[service])
+            return {"container_running": True, "issues": [], "name": service}
+
+        mock_docker_health.return_value = {"daemon_running": True}
+        mock_service_health.side_effect = slow_service_health
+        mock_network.return_value = {"issues": []}
+        mock_file_perms.return_value = {"permission_issues": []}
+        mock_env_vars.return_value = {"security_issues": []}
+
+        selected_services = ["jellyfin", "qbittorrent", "sonarr"]
+        results = health_checker.check_all_services(selected_services)
+
+        assert list(results["services"]) == selected_services
+        for service in selected_services:
+            assert results["services"][service]["name"] == service
 
     def test_determine_overall_status_healthy(self, health_checker):
         """Test overall status determination when all checks pass."""
@@ -475,6 +781,7 @@ class TestServiceHealthChecker:
             "overall_status": "healthy",
             "services": {"jellyfin": {"container_running": True}},
             "timestamp": time.time(),
+            "checked_at": _now_iso(),
         }
 
         output_file = temp_dir / "health_report.json"
@@ -487,7 +794,23 @@ class TestServiceHealthChecker:
 
         assert data["overall_status"] == "healthy"
         assert "services" in data
-        assert "timestamp" in data
+        assert isinstance(data["timestamp"], float)
+        assert isinstance(data["checked_at"], str)
+
+    def test_export_health_report_without_orjson(self, health_checker, temp_dir):
+        """Test health report export falls back to the json module."""
+        health_checker.health_results = {
+            "overall_status": "healthy",
+            "report_dir": temp_dir,
+        }
+
+        output_file = temp_dir / "health_report.json"
+        with patch("src.health_checker.orjson", None):
+            health_checker.export_health_report(output_file)
+
+        data = json.loads(output_file.read_text())
+        assert data["overall_status"] == "healthy"
+        assert data["report_dir"] == str(temp_dir)
 
     def test_export_health_report_no_results(self, health_checker, temp_dir, capsys):
         """Test health report export when no results are available."""
@@ -498,34 +821,104 @@ class TestServiceHealthChecker:
         captured = capsys.readouterr()
         assert "No health check results to export" in captured.out
 
-    @patch("builtins.open", side_effect=IOError("Permission denied"))
-    def test_export_health_report_failure(
-        self, mock_open, health_checker, temp_dir, capsys
-    ):
+    @pytest.mark.skipif(
+        os.name == "nt" or os.geteuid() == 0,
+        reason="directory permissions are not enforced here",
+    )
+    def test_export_health_report_failure(self, health_checker, tmp_path, capsys):
         """Test health report export failure."""
         health_checker.health_results = {"test": "data"}
 
-        output_file = temp_dir / "health_report.json"
-        health_checker.export_health_report(output_file)
+        readonly = tmp_path / "ro"
+        readonly.mkdir()
+        readonly.chmod(0o555)
+        try:
+            health_checker.export_health_report(readonly / "health_report.json")
+        finally:
+            readonly.chmod(0o755)
 
         captured = capsys.readouterr()
         assert "Failed to export health report" in captured.out
 
 
+class TestContainerLogStreaming:
+    """Test docker logs streaming against a fake subprocess."""
+
+    @pytest.fixture
+    def checker(self, temp_dir):
+        """Create a ServiceHealthChecker instance for testing."""
+        return ServiceHealthChecker(temp_dir / "docker", temp_dir / "media")
+
+    def test_stream_container_logs_yields_lines(self, checker):
+        """Test log lines are streamed from docker logs and the process reaped."""
+        process = FakePopen("INFO: starting\nINFO: ready\n")
+
+        with patch("subprocess.Popen", process):
+            lines = list(checker._stream_container_logs("jellyfin", tail=50))
+
+        assert lines == ["INFO: starting\n", "INFO: ready\n"]
+        assert process.args == ["docker", "logs", "--tail", "50", "jellyfin"]
+        assert process.stdout.closed
+        assert process.waited is True
+        assert process.killed is False
+
+    def test_analyze_container_logs_scans_every_line(self, checker):
+        """Test lines after a fatal error are still counted in the last 50 lines."""
+        process = FakePopen(
+            "INFO: starting\nFATAL: Cannot continue\nERROR: Shutting down\n"
+            "WARNING: Retrying in 5s\n"
+        )
+
+        with patch("subprocess.Popen", process):
+            result = checker._analyze_container_logs("jellyfin")
+
+        assert result["healthy"] is False
+        assert result["errors"] == ["FATAL: Cannot continue", "ERROR: Shutting down"]
+        assert result["warnings"] == ["WARNING: Retrying in 5s"]
+        assert process.args == ["docker", "logs", "--tail", "50", "jellyfin"]
+        assert process.stdout.closed
+        assert process.waited is True
+
+    def test_analyze_container_logs_stops_process_on_error(self, checker):
+        """Test a failure mid-stream kills and reaps the docker process."""
+        process = FakePopen("INFO: starting\n", finished=False)
+        process.stdout = MagicMock()
+        process.stdout.__iter__.side_effect = OSError("pipe closed")
+
+        with patch("subprocess.Popen", process):
+            result = checker._analyze_container_logs("jellyfin")
+
+        assert result["healthy"] is False
+        assert result["errors"] == ["Log analysis failed: pipe closed"]
+        assert process.killed is True
+        assert process.waited is True
+
+
+@pytest.fixture(scope="session")
+def skeleton_dirs(tmp_path_factory):
+    """Build the docker/media directory skeleton once per session."""
+    root = tmp_path_factory.mktemp("skeleton")
+    (root / "docker" / "jellyfin" / "config").mkdir(parents=True)
+    (root / "media" / "movies").mkdir(parents=True)
+    return root
+
+
+@pytest.fixture
+def skeleton_root(skeleton_dirs, temp_dir):
+    """Copy the directory skeleton into a per-test root."""
+    root = temp_dir / "root"
+    shutil.copytree(skeleton_dirs, root)
+    return root
+
+
 @pytest.mark.integration
 class TestHealthCheckerIntegration:
     """Integration tests for ServiceHealthChecker."""
 
-    def test_full_health_check_workflow(self, temp_dir):
+    def test_full_health_check_workflow(self, fake_commands, skeleton_root):
         """Test complete health check workflow."""
-        docker_dir = temp_dir / "docker"
-        media_dir = temp_dir / "media"
-        docker_dir.mkdir()
-        media_dir.mkdir()
-
-        # Create service directories
-        (docker_dir / "jellyfin" / "config").mkdir(parents=True)
-        (media_dir / "movies").mkdir(parents=True)
+        docker_dir = skeleton_root / "docker"
+        media_dir = skeleton_root / "media"
 
         checker = ServiceHealthChecker(docker_dir, media_dir)
 
@@ -543,27 +936,27 @@ class TestHealthCheckerIntegration:
         checker.load_service_config(services_config)
 
         # Mock all external dependencies
-        with patch.object(checker, "_is_container_running", return_value=False):
-            with patch.object(checker, "_check_docker_health") as mock_docker:
-                mock_docker.return_value = {
-                    "daemon_running": True,
-                    "compose_available": True,
-                    "issues": [],
-                }
+        fake_commands.register(
+            DOCKER_PS, stdout=_json_lines({"Names": "jellyfin", "State": "exited"})
+        )
+        with patch.object(checker, "_check_docker_health") as mock_docker:
+            mock_docker.return_value = {
+                "daemon_running": True,
+                "compose_available": True,
+                "issues": [],
+            }
 
-                results = checker.check_all_services(["jellyfin"])
+            results = checker.check_all_services(["jellyfin"])
 
-                assert "overall_status" in results
-                assert "services" in results
-                assert "jellyfin" in results["services"]
-                assert results["services"]["jellyfin"]["container_running"] is False
+            assert "overall_status" in results
+            assert "services" in results
+            assert "jellyfin" in results["services"]
+            assert results["services"]["jellyfin"]["container_running"] is False
 
-    def test_health_checker_with_vpn_service(self, temp_dir):
+    def test_health_checker_with_vpn_service(self, fake_commands, skeleton_root):
         """Test health checker with VPN service included."""
-        docker_dir = temp_dir / "docker"
-        media_dir = temp_dir / "media"
-        docker_dir.mkdir()
-        media_dir.mkdir()
+        docker_dir = skeleton_root / "docker"
+        media_dir = skeleton_root / "media"
 
         checker = ServiceHealthChecker(docker_dir, media_dir)
 
@@ -579,16 +972,25 @@ class TestHealthCheckerIntegration:
 
         checker.load_service_config(services_config)
 
+        fake_commands.register(
+            DOCKER_PS, stdout=_json_lines({"Names": "gluetun", "State": "running"})
+        )
+        fake_commands.register(
+            DOCKER_STATS,
+            stdout=_json_lines({"Name": "gluetun", "CPUPerc": "1.00%"}),
+        )
         with patch.object(checker, "_check_docker_health") as mock_docker:
-            with patch.object(checker, "_is_container_running", return_value=True):
-                with patch.object(checker, "_check_vpn_health") as mock_vpn:
-                    mock_docker.return_value = {"daemon_running": True, "issues": []}
-                    mock_vpn.return_value = {"vpn_connected": True, "issues": []}
+            with patch.object(checker, "_check_vpn_health") as mock_vpn:
+                mock_docker.return_value = {"daemon_running": True, "issues": []}
+                mock_vpn.return_value = {"vpn_connected": True, "issues": []}
 
-                    results = checker.check_all_services(["gluetun"])
+                results = checker.check_all_services(["gluetun"])
 
-                    assert "vpn_status" in results
-                    assert results["vpn_status"]["vpn_connected"] is True
+                assert "vpn_status" in results
+                assert results["vpn_status"]["vpn_connected"] is True
+                gluetun = results["services"]["gluetun"]
+                assert gluetun["container_running"] is True
+                assert gluetun["resource_usage"]["cpu_percent"] == 1.0
 
 
 @pytest.mark.integration
@@ -9,16 +9,21 @@ from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
-from src.setup_core import MediaServerSetup
+
+@pytest.fixture(scope="session")
+def shared_setup(_setup_prototype):
+    """One MediaServerSetup shared by tests that never mutate it."""
+    return _setup_prototype
 
 
 @pytest.mark.integration
+@pytest.mark.xdist_group("media_setup")
 class TestMediaServerSetupIntegration:
     """Integration tests for complete setup workflows."""
 
-    def test_complete_initialization_chain(self):
+    def test_complete_initialization_chain(self, shared_setup):
         """Test that all components initialize properly together."""
-        setup = MediaServerSetup()
+        setup = shared_setup
 
         # Verify all components are created
         assert setup.template_loader is not None
@@ -36,10 +41,8 @@ class TestMediaServerSetupIntegration:
         categories = setup.template_loader.get_categories()
         assert len(categories) > 0
 
-    def test_system_validation_integration(self):
+    def test_system_validation_integration(self, setup):
         """Test system validation with mocked subprocess."""
-        setup = MediaServerSetup()
-
         # Mock Docker commands
         with patch("subprocess.run") as mock_run:
             mock_run.return_value = MagicMock(
@@ -51,24 +54,20 @@ class TestMediaServerSetupIntegration:
             # With mocked successful Docker, validation should complete
             assert isinstance(result, bool)
 
-    def test_template_validation_integration(self):
+    def test_template_validation_integration(self, shared_setup):
         """Test template validation with actual template files."""
-        setup = MediaServerSetup()
-
         # This should validate the actual template files
-        result = setup._validate_templates()
+        result = shared_setup._validate_templates()
 
         # Should succeed with valid templates
         assert result is True
 
-    def test_directory_structure_integration(self, tmp_path):
+    def test_directory_structure_integration(self, setup, tmp_path):
         """Test directory structure creation with real paths."""
-        setup = MediaServerSetup()
-
         docker_dir = tmp_path / "docker"
         media_dir = tmp_path / "media"
 
-        # Create directories
+        # Create directories (records them on the manager, so use a private copy)
         success, messages = setup.directory_manager.create_directory_structure(
             docker_dir, media_dir, uid=1000, gid=1000
         )
@@ -80,15 +79,13 @@ class TestMediaServerSetupIntegration:
         assert docker_dir.exists()
         assert media_dir.exists()
 
-    def test_file_generation_integration(self, tmp_path):
+    def test_file_generation_integration(self, shared_setup, tmp_path):
         """Test file generation with real service configuration."""
-        setup = MediaServerSetup()
-
         output_dir = tmp_path / "output"
         output_dir.mkdir()
 
         # Generate files
-        results = setup.file_generator.generate_all_files(
+        results = shared_setup.file_generator.generate_all_files(
             selected_services=["jellyfin"],
             uid=1000,
             gid=1000,
@@ -110,10 +107,8 @@ class TestMediaServerSetupIntegration:
         env_file = output_dir / ".env"
         assert env_file.exists()
 
-    def test_service_selection_flow(self):
+    def test_service_selection_flow(self, setup):
         """Test service selection integrates properly with template loader."""
-        setup = MediaServerSetup()
-
         # Mock the entire selector to avoid user interaction
         with patch.object(setup, "_select_services") as mock_select:
             # Manually set services
@@ -123,9 +118,8 @@ class TestMediaServerSetupIntegration:
             assert setup.selected_services == ["jellyfin", "sonarr"]
             assert len(setup.selected_services) == 2
 
-    def test_vpn_configuration_integration(self):
+    def test_vpn_configuration_integration(self, setup):
         """Test VPN configuration integrates with gluetun configurator."""
-        setup = MediaServerSetup()
         setup.selected_services = ["gluetun", "qbittorrent"]
 
         # Mock VPN configuration
@@ -140,9 +134,8 @@ class TestMediaServerSetupIntegration:
             # Configurator should have been called
             mock_config.assert_called_once()
 
-    def test_access_information_generation(self, capsys):
+    def test_access_information_generation(self, setup, capsys):
         """Test that access information is generated correctly."""
-        setup = MediaServerSetup()
         setup.selected_services = ["jellyfin", "sonarr"]
         setup.host_ip = "192.168.1.100"
 
@@ -2,23 +2,195 @@
 Tests for setup_core module.
 """
 
-import os
-import sys
+import io
+from contextlib import ExitStack, redirect_stdout
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 
-from src.setup_core import MediaServerSetup
+DOCKER_DIR = Path("/opt/docker")
+MEDIA_DIR = Path("/srv/media")
+COMPOSE_DIR = DOCKER_DIR / "compose"
+
+EXPECTED_COMPLETION = (
+    "SETUP COMPLETE!",
+    "Services: 2 selected",
+    "VPN Configuration:",
+    "qBittorrent traffic is routed through VPN",
+    "Next Steps:",
+    "Useful Commands:",
+)
+
+
+class CountOnly:
+    """Callable that only counts how often it was invoked."""
+
+    __slots__ = ("n",)
+
+    def __init__(self):
+        self.n = 0
+
+    def __call__(self, *args, **kwargs):
+        self.n += 1
+
+
+def _fake_progress():
+    """Return a stand-in for ProgressReporter with only the step hooks."""
+    return SimpleNamespace(
+        start_step=CountOnly(), step_success=CountOnly(), step_failed=CountOnly()
+    )
+
+
+class Patches:
+    """Patch methods on one or more objects by name using a single ExitStack.
+
+    Values passed to the constructor or returns() become return values;
+    side_effects() sets side effects instead. Mocks are available by method
+    name, so a name may only be patched once per block.
+    """
+
+    def __init__(self, target=None, **return_values):
+        self._stack = ExitStack()
+        self._pending = []
+        self.mocks = {}
+        if target is not None:
+            self.returns(target, **return_values)
+
+    def returns(self, target, **return_values):
+        """Queue methods of target to patch with fixed return values."""
+        return self._queue(target, "return_value", return_values)
+
+    def side_effects(self, target, **side_effects):
+        """Queue methods of target to patch with side effects."""
+        return self._queue(target, "side_effect", side_effects)
+
+    def _queue(self, target, kind, methods):
+        for name, value in methods.items():
+            if any(name == queued for _, queued, _, _ in self._pending):
+                raise ValueError(f"{name} is already patched in this block")
+            self._pending.append((target, name, kind, value))
+        return self
+
+    def __enter__(self):
+        with ExitStack() as stack:
+            for target, name, kind, value in self._pending:
+                self.mocks[name] = stack.enter_context(
+                    patch.object(target, name, **{kind: value})
+                )
+            # Only keep the patches once every one of them applied
+            self._stack = stack.pop_all()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._stack.__exit__(*exc_info)
+
+    def __getitem__(self, name):
+        return self.mocks[name]
 
 
 class TestMediaServerSetup:
     """Test MediaServerSetup class."""
 
-    def test_init(self):
+    @pytest.fixture
+    def mock_collector(self):
+        """Patch UserConfigCollector in setup_core with a spec'd mock."""
+        from src.setup_core import UserConfigCollector
+
+        collector = MagicMock(spec=UserConfigCollector)
+        with patch("src.setup_core.UserConfigCollector", new=collector):
+            yield collector
+
+    @pytest.fixture
+    def mock_container_tester(self):
+        """Patch ContainerTester in setup_core with a spec'd mock."""
+        from src.setup_core import ContainerTester
+
+        tester = MagicMock(spec=ContainerTester)
+        with patch("src.setup_core.ContainerTester", new=tester):
+            yield tester
+
+    @pytest.fixture
+    def selection_patches(self, configured_setup, sample_services, mock_collector):
+        """Patch template lookups and the selector; yield the config collector."""
+        from src import setup_core
+
+        setup = configured_setup(
+            selected_services=[],
+            username="testuser",
+            docker_dir=DOCKER_DIR,
+            media_dir=MEDIA_DIR,
+        )
+        selector = MagicMock()
+        selector.select_services.return_value = ["jellyfin"]
+
+        with Patches(
+            setup.template_loader,
+            get_services=sample_services,
+            get_categories={},
+            get_services_by_category={},
+        ).returns(setup_core, ServiceSelector=selector):
+            yield mock_collector
+
+    @pytest.fixture
+    def file_setup_patches(self, setup):
+        """Patch directory and file collaborators with successful results."""
+        with Patches(
+            setup.directory_manager,
+            create_directory_structure=(True, []),
+            create_service_directories=(True, []),
+            fix_permissions=[],
+        ).returns(
+            setup.file_generator,
+            generate_all_files={
+                "docker-compose.yml": True,
+                ".env": True,
+                "SETUP_GUIDE.md": True,
+            },
+            validate_generated_files=[],
+        ) as patches:
+            yield patches
+
+    @pytest.fixture
+    def configured_setup(self, setup, shared_temp_dir):
+        """Return a factory that fills in setup's user configuration."""
+
+        def make(**overrides):
+            config = {
+                "selected_services": ["jellyfin"],
+                "docker_dir": shared_temp_dir / "docker",
+                "media_dir": shared_temp_dir / "media",
+                "output_dir": shared_temp_dir / "output",
+                "uid": 1000,
+                "gid": 1000,
+                "timezone": "UTC",
+                "host_ip": "localhost",
+            }
+            config.update(overrides)
+            for name, value in config.items():
+                setattr(setup, name, value)
+            return setup
+
+        return make
+
+    @pytest.fixture
+    def spec_setup(self, setup_cls):
+        """Return a MediaServerSetup-shaped mock for pure dispatch tests."""
+        mock_self = Mock(spec=setup_cls)
+        mock_self.progress = _fake_progress()
+        mock_self.gluetun_configurator = Mock()
+        mock_self.selected_services = []
+        return mock_self
+
+    @pytest.fixture
+    def ssh_env(self, monkeypatch):
+        """Simulate running over an SSH session."""
+        monkeypatch.setenv("SSH_CLIENT", "192.168.1.100")
+
+    def test_init(self, _setup_prototype):
         """Test MediaServerSetup initialization."""
-        setup = MediaServerSetup()
-
+        setup = _setup_prototype
         assert setup.template_loader is not None
         assert setup.system_validator is not None
         assert setup.directory_manager is not None
@@ -33,307 +205,200 @@ class TestMediaServerSetup:
         assert setup.selected_services == []
         assert setup.remote_access is False
 
-    def test_print_welcome_local_mode(self, capsys, mock_os_operations):
+    def test_print_welcome_local_mode(self, setup, mock_os_operations):
         """Test welcome message in local mode."""
-        setup = MediaServerSetup()
-        setup._print_welcome()
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            setup._print_welcome()
 
-        captured = capsys.readouterr()
-        assert "MEDIA SERVER SETUP" in captured.out
-        assert "Welcome to the Media Server Setup Script!" in captured.out
-        assert "Local setup mode" in captured.out
+        out = buf.getvalue()
+        assert "MEDIA SERVER SETUP" in out
+        assert "Welcome to the Media Server Setup Script!" in out
+        assert "Local setup mode" in out
 
-    def test_print_welcome_ssh_mode(self, capsys):
+    def test_print_welcome_ssh_mode(self, setup, ssh_env):
         """Test welcome message in SSH mode."""
-        with patch.dict(os.environ, {"SSH_CLIENT": "192.168.1.100"}):
-            setup = MediaServerSetup()
+        buf = io.StringIO()
+        with redirect_stdout(buf):
             setup._print_welcome()
 
-        captured = capsys.readouterr()
-        assert "SSH connection detected - remote setup mode" in captured.out
+        out = buf.getvalue()
+        assert "SSH connection detected - remote setup mode" in out
 
-    def test_detect_access_mode_local(self, mock_os_operations):
+    def test_detect_access_mode_local(self, setup, mock_os_operations):
         """Test access mode detection for local access."""
-        setup = MediaServerSetup()
         setup._detect_access_mode()
 
         assert setup.remote_access is False
         assert setup.host_ip == "localhost"
 
-    def test_detect_access_mode_ssh(self):
+    def test_detect_access_mode_ssh(self, setup, ssh_env):
         """Test access mode detection for SSH access."""
-        with patch.dict(os.environ, {"SSH_CLIENT": "192.168.1.100"}):
-            with patch("src.setup_core.get_local_network_ip", return_value="10.0.0.5"):
-                setup = MediaServerSetup()
-                setup._detect_access_mode()
+        with patch("src.setup_core.get_local_network_ip", return_value="10.0.0.5"):
+            setup._detect_access_mode()
 
         assert setup.remote_access is True
         assert setup.host_ip == "10.0.0.5"
 
-    def test_validate_templates_success(self):
-        """Test successful template validation."""
-        setup = MediaServerSetup()
-
-        with patch.object(setup.template_loader, "validate_services", return_value=[]):
+    @pytest.mark.parametrize(
+        "value, expected", [("1", True), ("TRUE", True), ("yes", True), ("0", False)]
+    )
+    def test_should_show_debug_info(self, setup, monkeypatch, value, expected):
+        """Test DEBUG environment values that enable tracebacks."""
+        monkeypatch.setenv("DEBUG", value)
+
+        assert setup._should_show_debug_info() is expected
+
+    def test_should_show_debug_info_unset(self, setup, monkeypatch):
+        """Test debug info is off when DEBUG is not set."""
+        monkeypatch.delenv("DEBUG", raising=False)
+
+        assert setup._should_show_debug_info() is False
+
+    @pytest.mark.parametrize("valid, expected", [(True, True), (False, False)])
+    def test_validate_system(self, setup, valid, expected):
+        """Test system validation result is passed through."""
+        with patch.object(setup.system_validator, "validate_all", return_value=valid):
+            assert setup._validate_system() is expected
+
+    @pytest.mark.parametrize(
+        "patch_kwargs, expected",
+        [
+            ({"return_value": []}, True),
+            ({"return_value": ["Error 1", "Error 2"]}, False),
+            ({"side_effect": Exception("Template error")}, False),
+        ],
+        ids=["success", "failure", "exception"],
+    )
+    def test_validate_templates(self, setup, patch_kwargs, expected):
+        """Test template validation outcomes."""
+        with patch.object(setup.template_loader, "validate_services", **patch_kwargs):
             result = setup._validate_templates()
 
-        assert result is True
-
-    def test_validate_templates_failure(self):
-        """Test failed template validation."""
-        setup = MediaServerSetup()
-
-        with patch.object(
-            setup.template_loader,
-            "validate_services",
-            return_value=["Error 1", "Error 2"],
-        ):
-            result = setup._validate_templates()
-
-        assert result is False
+        assert result is expected
 
-    def test_validate_templates_exception(self):
-        """Test template validation with exception."""
-        setup = MediaServerSetup()
-
-        with patch.object(
-            setup.template_loader,
-            "validate_services",
-            side_effect=Exception("Template error"),
-        ):
-            result = setup._validate_templates()
-
-        assert result is False
-
-    def test_collect_user_configuration(self, mock_os_operations):
+    def test_collect_user_configuration(
+        self, setup, mock_os_operations, mock_collector
+    ):
         """Test user configuration collection."""
-        setup = MediaServerSetup()
+        mock_collector.get_user_info.return_value = ("testuser", 1000, 1000)
+        mock_collector.get_directory_paths.return_value = (
+            str(DOCKER_DIR),
+            str(MEDIA_DIR),
+        )
 
-        with patch("src.setup_core.UserConfigCollector") as mock_collector:
-            mock_collector.get_user_info.return_value = ("testuser", 1000, 1000)
-            mock_collector.get_directory_paths.return_value = (
-                "/opt/docker",
-                "/srv/media",
-            )
-
-            with patch("src.setup_core.get_timezone", return_value="UTC"):
-                setup._collect_user_configuration()
+        with patch("src.setup_core.get_timezone", return_value="UTC"):
+            setup._collect_user_configuration()
 
         assert setup.username == "testuser"
         assert setup.uid == 1000
         assert setup.gid == 1000
-        assert setup.docker_dir == Path("/opt/docker")
-        assert setup.media_dir == Path("/srv/media")
-        assert setup.output_dir == Path("/opt/docker/compose")
+        assert setup.docker_dir == DOCKER_DIR
+        assert setup.media_dir == MEDIA_DIR
+        assert setup.output_dir == COMPOSE_DIR
         assert setup.timezone == "UTC"
 
-    def test_select_services(self, sample_services):
+    def test_select_services(self, setup, selection_patches):
         """Test service selection."""
-        setup = MediaServerSetup()
+        selection_patches.confirm_setup.return_value = True
 
-        with patch.object(
-            setup.template_loader, "get_services", return_value=sample_services
-        ):
-            with patch.object(setup.template_loader, "get_categories", return_value={}):
-                with patch.object(
-                    setup.template_loader, "get_services_by_category", return_value={}
-                ):
-                    with patch("src.setup_core.ServiceSelector") as mock_selector:
-                        mock_selector_instance = Mock()
-                        mock_selector_instance.select_services.return_value = [
-                            "jellyfin"
-                        ]
-                        mock_selector.return_value = mock_selector_instance
-
-                        with patch(
-                            "src.setup_core.UserConfigCollector"
-                        ) as mock_collector:
-                            mock_collector.confirm_setup.return_value = True
-
-                            # Set up required attributes
-                            setup.username = "testuser"
-                            setup.docker_dir = Path("/opt/docker")
-                            setup.media_dir = Path("/srv/media")
-
-                            setup._select_services()
+        setup._select_services()
 
         assert setup.selected_services == ["jellyfin"]
 
-    def test_select_services_user_cancels(self, sample_services):
+    def test_select_services_user_cancels(self, setup, selection_patches):
         """Test service selection when user cancels."""
-        setup = MediaServerSetup()
+        selection_patches.confirm_setup.return_value = False
+
+        with pytest.raises(SystemExit):
+            setup._select_services()
+
+    @pytest.mark.parametrize(
+        "services, configured",
+        [
+            (["jellyfin"], False),
+            (["qbittorrent"], False),
+            (["gluetun", "jellyfin"], False),
+            (["gluetun", "qbittorrent"], True),
+        ],
+        ids=["no-torrent", "no-gluetun", "gluetun-only", "gluetun-and-torrent"],
+    )
+    def test_configure_vpn(self, setup, services, configured):
+        """Test VPN is only configured when gluetun and qBittorrent are selected."""
+        setup.selected_services = list(services)
 
         with patch.object(
-            setup.template_loader, "get_services", return_value=sample_services
-        ):
-            with patch.object(setup.template_loader, "get_categories", return_value={}):
-                with patch.object(
-                    setup.template_loader, "get_services_by_category", return_value={}
-                ):
-                    with patch("src.setup_core.ServiceSelector") as mock_selector:
-                        mock_selector_instance = Mock()
-                        mock_selector_instance.select_services.return_value = [
-                            "jellyfin"
-                        ]
-                        mock_selector.return_value = mock_selector_instance
-
-                        with patch(
-                            "src.setup_core.UserConfigCollector"
-                        ) as mock_collector:
-                            mock_collector.confirm_setup.return_value = False
-
-                            # Set up required attributes
-                            setup.username = "testuser"
-                            setup.docker_dir = Path("/opt/docker")
-                            setup.media_dir = Path("/srv/media")
-
-                            with pytest.raises(SystemExit):
-                                setup._select_services()
-
-    def test_configure_vpn_no_qbittorrent(self):
-        """Test VPN configuration when qBittorrent is not selected."""
-        setup = MediaServerSetup()
-        setup.selected_services = ["jellyfin"]
-
-        setup._configure_vpn()
-
-        # Should not configure VPN without qBittorrent
-        assert not setup.gluetun_configurator.enabled
-
-    def test_configure_vpn_with_qbittorrent_enabled(self):
-        """Test VPN configuration with qBittorrent and gluetun selected and VPN enabled."""
-        setup = MediaServerSetup()
-        setup.selected_services = ["gluetun", "qbittorrent"]
-
-        with patch.object(setup.gluetun_configurator, "configure", return_value=True):
-            setup._configure_vpn()
-
-        # Gluetun should remain in selected services
-        assert "gluetun" in setup.selected_services
-
-    def test_configure_vpn_with_qbittorrent_disabled(self):
-        """Test VPN configuration skipped when gluetun not selected."""
-        setup = MediaServerSetup()
-        setup.selected_services = ["qbittorrent"]
-
-        with patch.object(setup.gluetun_configurator, "configure", return_value=False):
+            setup.gluetun_configurator, "configure", return_value=True
+        ) as mock_configure:
             setup._configure_vpn()
 
-        # Gluetun was never selected, so it shouldn't be in the list
-        assert "gluetun" not in setup.selected_services
+        assert mock_configure.called is configured
+        # Selection is left untouched either way
+        assert setup.selected_services == services
 
-    def test_setup_directories_and_files_success(self, temp_dir):
+    def test_setup_directories_and_files_success(
+        self, configured_setup, file_setup_patches
+    ):
         """Test successful directories and files setup."""
-        setup = MediaServerSetup()
-        setup.selected_services = ["jellyfin"]
-        setup.docker_dir = temp_dir / "docker"
-        setup.media_dir = temp_dir / "media"
-        setup.output_dir = temp_dir / "output"
-        setup.uid = 1000
-        setup.gid = 1000
-        setup.timezone = "UTC"
-
-        # Mock successful operations
-        with patch.object(
-            setup.directory_manager,
-            "create_directory_structure",
-            return_value=(True, []),
-        ):
-            with patch.object(
-                setup.directory_manager,
-                "create_service_directories",
-                return_value=(True, []),
-            ):
-                with patch.object(
-                    setup.file_generator,
-                    "generate_all_files",
-                    return_value={
-                        "docker-compose.yml": True,
-                        ".env": True,
-                        "SETUP_GUIDE.md": True,
-                    },
-                ):
-                    with patch.object(
-                        setup.file_generator,
-                        "validate_generated_files",
-                        return_value=[],
-                    ):
-                        with patch.object(
-                            setup.directory_manager, "fix_permissions", return_value=[]
-                        ):
-                            result = setup._setup_directories_and_files()
+        setup = configured_setup()
+
+        result = setup._setup_directories_and_files()
 
         assert result is True
 
-    def test_setup_directories_and_files_directory_failure(self, temp_dir):
+    def test_setup_directories_and_files_directory_failure(
+        self, configured_setup, file_setup_patches
+    ):
         """Test directories and files setup with directory creation failure."""
-        setup = MediaServerSetup()
-        setup.selected_services = ["jellyfin"]
+        setup = configured_setup()
+        file_setup_patches["create_directory_structure"].return_value = (
+            False,
+            ["Failed to create directory"],
+        )
 
-        # Mock directory creation failure
-        with patch.object(
-            setup.directory_manager,
-            "create_directory_structure",
-            return_value=(False, ["Failed to create directory"]),
-        ):
-            result = setup._setup_directories_and_files()
+        result = setup._setup_directories_and_files()
 
         assert result is False
+        file_setup_patches["generate_all_files"].assert_not_called()
 
-    def test_setup_directories_and_files_file_generation_failure(self, temp_dir):
+    def test_setup_directories_and_files_file_generation_failure(
+        self, configured_setup, file_setup_patches
+    ):
         """Test directories and files setup with file generation failure."""
-        setup = MediaServerSetup()
-        setup.selected_services = ["jellyfin"]
+        setup = configured_setup()
+        file_setup_patches["generate_all_files"].return_value = {
+            "docker-compose.yml": False,
+            ".env": True,
+            "SETUP_GUIDE.md": True,
+        }
 
-        # Mock successful directory creation but failed file generation
-        with patch.object(
-            setup.directory_manager,
-            "create_directory_structure",
-            return_value=(True, []),
-        ):
-            with patch.object(
-                setup.directory_manager,
-                "create_service_directories",
-                return_value=(True, []),
-            ):
-                with patch.object(
-                    setup.file_generator,
-                    "generate_all_files",
-                    return_value={
-                        "docker-compose.yml": False,
-                        ".env": True,
-                        "SETUP_GUIDE.md": True,
-                    },
-                ):
-                    result = setup._setup_directories_and_files()
+        result = setup._setup_directories_and_files()
 
         assert result is False
 
-    def test_start_containers_success(self, temp_dir, mock_subprocess):
+    def test_start_containers_success(
+        self, configured_setup, shared_temp_dir, mock_subprocess, jellyfin_services
+    ):
         """Test successful container startup."""
-        setup = MediaServerSetup()
-        setup.output_dir = temp_dir
+        setup = configured_setup(output_dir=shared_temp_dir)
         setup.gluetun_configurator.enabled = False
-        setup.selected_services = ["jellyfin"]
-        setup.host_ip = "localhost"
 
         # Mock successful subprocess run
         mock_subprocess.return_value.returncode = 0
 
         with patch.object(
-            setup.template_loader,
-            "get_services",
-            return_value={"jellyfin": {"name": "Jellyfin", "port": 8096}},
+            setup.template_loader, "get_services", return_value=jellyfin_services
         ):
             setup._start_containers()
 
         # Should call docker compose up
         mock_subprocess.assert_called()
 
-    def test_start_containers_failure(self, temp_dir, mock_subprocess):
+    def test_start_containers_failure(
+        self, configured_setup, shared_temp_dir, mock_subprocess
+    ):
         """Test container startup failure."""
-        setup = MediaServerSetup()
-        setup.output_dir = temp_dir
+        setup = configured_setup(output_dir=shared_temp_dir)
         setup.gluetun_configurator.enabled = False
 
         # Mock failed subprocess run
@@ -345,243 +410,232 @@ class TestMediaServerSetup:
         # Should handle the error gracefully
         mock_subprocess.assert_called()
 
-    def test_test_gluetun_connection_success(self):
-        """Test successful Gluetun connection test."""
-        setup = MediaServerSetup()
-
-        with patch("src.setup_core.ContainerTester") as mock_tester:
-            mock_tester.test_gluetun_connection.return_value = (True, "VPN working!")
-
-            setup._test_gluetun_connection()
-
-        mock_tester.test_gluetun_connection.assert_called_once()
-
-    def test_test_gluetun_connection_failure(self):
-        """Test failed Gluetun connection test."""
-        setup = MediaServerSetup()
-
-        with patch("src.setup_core.ContainerTester") as mock_tester:
-            mock_tester.test_gluetun_connection.return_value = (False, "VPN failed!")
-
+    @pytest.mark.parametrize(
+        "outcome,expected",
+        [
+            ((True, "VPN working!"), ["VPN Connection Test:", "  VPN working!"]),
+            (
+                (False, "VPN failed!"),
+                ["VPN test failed: VPN failed!", "docker logs gluetun"],
+            ),
+        ],
+        ids=["ok", "fail"],
+    )
+    def test_test_gluetun_connection(
+        self, setup, mock_container_tester, outcome, expected
+    ):
+        """Test Gluetun connection test reports either outcome."""
+        mock_container_tester.test_gluetun_connection.return_value = outcome
+
+        buf = io.StringIO()
+        with redirect_stdout(buf):
             setup._test_gluetun_connection()
 
-        mock_tester.test_gluetun_connection.assert_called_once()
+        mock_container_tester.test_gluetun_connection.assert_called_once_with(
+            timeout=60
+        )
+        out = buf.getvalue()
+        for fragment in expected:
+            assert fragment in out
 
-    def test_show_access_information(self, capsys):
+    def test_show_access_information(self, configured_setup, jellyfin_services):
         """Test access information display."""
-        setup = MediaServerSetup()
-        setup.selected_services = ["jellyfin", "qbittorrent"]
-        setup.host_ip = "192.168.1.100"
+        setup = configured_setup(
+            selected_services=["jellyfin", "qbittorrent"], host_ip="192.168.1.100"
+        )
         setup.gluetun_configurator.enabled = False
         setup.gluetun_configurator.route_qbittorrent = False
 
-        services = {
-            "jellyfin": {"name": "Jellyfin", "port": 8096},
-            "qbittorrent": {"name": "qBittorrent", "port": 8080},
-        }
-
-        with patch.object(setup.template_loader, "get_services", return_value=services):
+        buf = io.StringIO()
+        with patch.object(
+            setup.template_loader, "get_services", return_value=jellyfin_services
+        ), redirect_stdout(buf):
             setup._show_access_information()
 
-        captured = capsys.readouterr()
-        assert "SERVICE ACCESS INFORMATION" in captured.out
-        assert "Jellyfin" in captured.out
-        assert "qBittorrent" in captured.out
-        assert "192.168.1.100:8096" in captured.out
-        assert "192.168.1.100:8080" in captured.out
+        out = buf.getvalue()
+        assert "SERVICE ACCESS INFORMATION" in out
+        assert "Jellyfin" in out
+        assert "qBittorrent" in out
+        assert "192.168.1.100:8096" in out
+        assert "192.168.1.100:8080" in out
 
-    def test_show_access_information_with_vpn(self, capsys):
+    def test_show_access_information_with_vpn(
+        self, configured_setup, jellyfin_services
+    ):
         """Test access information display with VPN routing."""
-        setup = MediaServerSetup()
-        setup.selected_services = ["qbittorrent"]
-        setup.host_ip = "192.168.1.100"
+        setup = configured_setup(
+            selected_services=["qbittorrent"], host_ip="192.168.1.100"
+        )
         setup.gluetun_configurator.enabled = True
         setup.gluetun_configurator.route_qbittorrent = True
 
-        services = {"qbittorrent": {"name": "qBittorrent", "port": 8080}}
-
-        with patch.object(setup.template_loader, "get_services", return_value=services):
+        buf = io.StringIO()
+        with patch.object(
+            setup.template_loader, "get_services", return_value=jellyfin_services
+        ), redirect_stdout(buf):
             setup._show_access_information()
 
-        captured = capsys.readouterr()
-        assert "via Gluetun" in captured.out
+        out = buf.getvalue()
+        assert "via Gluetun" in out
 
-    def test_interactive_walkthrough(self, mock_os_operations):
+    def test_interactive_walkthrough(
+        self, configured_setup, mock_os_operations, jellyfin_services
+    ):
         """Test interactive walkthrough."""
-        setup = MediaServerSetup()
-        setup.selected_services = ["jellyfin", "qbittorrent"]
-        setup.host_ip = "localhost"
+        setup = configured_setup(selected_services=["jellyfin", "qbittorrent"])
         setup.gluetun_configurator.enabled = False
 
-        services = {
-            "jellyfin": {
-                "name": "Jellyfin",
-                "port": 8096,
-                "setup_steps": ["Open web interface", "Complete setup"],
-            },
-            "qbittorrent": {
-                "name": "qBittorrent",
-                "port": 8080,
-                "setup_steps": ["Get password from logs"],
-            },
-        }
+        from src import setup_core
 
-        with patch.object(setup.template_loader, "get_services", return_value=services):
-            with patch("src.setup_core.wait_for_done") as mock_wait:
-                setup._interactive_walkthrough()
+        with Patches(setup.template_loader, get_services=jellyfin_services).returns(
+            setup_core, wait_for_done=None
+        ) as patches:
+            setup._interactive_walkthrough()
 
         # Should call wait_for_done for each service
-        assert mock_wait.call_count == 2
+        assert patches["wait_for_done"].call_count == 2
 
-    def test_run_success_flow(self, mock_os_operations):
+    def test_run_success_flow(self, setup, mock_os_operations):
         """Test successful complete run flow."""
-        setup = MediaServerSetup()
-
         # Mock all steps to succeed
-        with patch.object(setup, "_print_welcome"):
-            with patch.object(setup, "_run_setup_steps"):
-                with patch.object(setup, "_print_completion_message"):
-                    setup.run()
-
-        # Should complete without exceptions
-
-    def test_run_keyboard_interrupt(self):
+        with Patches(
+            setup,
+            _print_welcome=None,
+            _run_setup_steps=None,
+            _print_completion_message=None,
+        ) as steps:
+            setup.run()
+
+        steps["_run_setup_steps"].assert_called_once()
+        steps["_print_completion_message"].assert_called_once()
+
+    def test_run_keyboard_interrupt(self, spec_setup, setup_cls):
         """Test run with keyboard interrupt."""
-        setup = MediaServerSetup()
+        spec_setup._print_welcome.side_effect = KeyboardInterrupt()
 
-        with patch.object(setup, "_print_welcome", side_effect=KeyboardInterrupt()):
-            with pytest.raises(SystemExit) as exc_info:
-                setup.run()
+        with pytest.raises(SystemExit) as exc_info:
+            setup_cls.run(spec_setup)
 
         assert exc_info.value.code == 1
 
-    def test_run_general_exception(self):
+    def test_run_general_exception(self, spec_setup, setup_cls):
         """Test run with general exception."""
-        setup = MediaServerSetup()
+        spec_setup._print_welcome.side_effect = Exception("Test error")
+        spec_setup._should_show_debug_info.return_value = False
 
-        with patch.object(setup, "_print_welcome", side_effect=Exception("Test error")):
-            with patch.object(setup, "_should_show_debug_info", return_value=False):
-                with pytest.raises(SystemExit) as exc_info:
-                    setup.run()
+        with pytest.raises(SystemExit) as exc_info:
+            setup_cls.run(spec_setup)
 
         assert exc_info.value.code == 1
 
-    def test_run_general_exception_with_debug(self):
+    def test_run_general_exception_with_debug(self, spec_setup, setup_cls):
         """Test run with general exception and debug enabled."""
-        setup = MediaServerSetup()
+        spec_setup._print_welcome.side_effect = Exception("Test error")
+        spec_setup._should_show_debug_info.return_value = True
 
-        with patch.object(setup, "_print_welcome", side_effect=Exception("Test error")):
-            with patch.object(setup, "_should_show_debug_info", return_value=True):
-                with patch("traceback.print_exc") as mock_traceback:
-                    with pytest.raises(SystemExit) as exc_info:
-                        setup.run()
+        with patch("traceback.print_exc") as mock_traceback:
+            with pytest.raises(SystemExit) as exc_info:
+                setup_cls.run(spec_setup)
 
         assert exc_info.value.code == 1
         mock_traceback.assert_called_once()
 
-    def test_handle_final_setup_start_containers(self, temp_dir):
+    def test_handle_final_setup_start_containers(self, setup, shared_temp_dir):
         """Test final setup with container start."""
-        setup = MediaServerSetup()
-        setup.output_dir = temp_dir
+        setup.output_dir = shared_temp_dir
 
-        with patch("src.setup_core.prompt_yes_no") as mock_prompt:
-            mock_prompt.side_effect = [True, False]  # Start containers, no walkthrough
+        from src import setup_core
 
-            with patch.object(setup, "_start_containers") as mock_start:
-                setup._handle_final_setup()
+        # Start containers, no walkthrough
+        with Patches(setup, _start_containers=None).side_effects(
+            setup_core, prompt_yes_no=[True, False]
+        ) as patches:
+            setup._handle_final_setup()
 
-        mock_start.assert_called_once()
+        patches["_start_containers"].assert_called_once()
 
-    def test_handle_final_setup_walkthrough(self, temp_dir):
+    def test_handle_final_setup_walkthrough(self, setup, shared_temp_dir):
         """Test final setup with walkthrough."""
-        setup = MediaServerSetup()
-        setup.output_dir = temp_dir
+        setup.output_dir = shared_temp_dir
 
-        with patch("src.setup_core.prompt_yes_no") as mock_prompt:
-            mock_prompt.side_effect = [
-                False,
-                True,
-            ]  # Don't start containers, do walkthrough
+        from src import setup_core
 
-            with patch.object(setup, "_interactive_walkthrough") as mock_walkthrough:
-                setup._handle_final_setup()
+        # Don't start containers, do walkthrough
+        with Patches(setup, _interactive_walkthrough=None).side_effects(
+            setup_core, prompt_yes_no=[False, True]
+        ) as patches:
+            setup._handle_final_setup()
 
-        mock_walkthrough.assert_called_once()
+        patches["_interactive_walkthrough"].assert_called_once()
 
-    def test_print_completion_message(self, capsys):
+    def test_print_completion_message(self, configured_setup):
         """Test completion message printing."""
-        setup = MediaServerSetup()
-        setup.selected_services = ["jellyfin", "qbittorrent"]
-        setup.docker_dir = Path("/opt/docker")
-        setup.media_dir = Path("/srv/media")
-        setup.output_dir = Path("/opt/docker/compose")
+        setup = configured_setup(
+            selected_services=["jellyfin", "qbittorrent"],
+            docker_dir=DOCKER_DIR,
+            media_dir=MEDIA_DIR,
+            output_dir=COMPOSE_DIR,
+        )
         setup.gluetun_configurator.enabled = True
         setup.gluetun_configurator.route_qbittorrent = True
 
-        setup._print_completion_message()
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            setup._print_completion_message()
 
-        captured = capsys.readouterr()
-        assert "SETUP COMPLETE!" in captured.out
-        assert "Services: 2 selected" in captured.out
-        assert "VPN Configuration:" in captured.out
-        assert "qBittorrent traffic is routed through VPN" in captured.out
-        assert "Next Steps:" in captured.out
-        assert "Useful Commands:" in captured.out
+        out = buf.getvalue()
+        missing = [text for text in EXPECTED_COMPLETION if text not in out]
+        assert not missing, f"missing: {missing}"
 
-    def test_run_setup_steps_complete_flow(self, mock_os_operations):
+    def test_run_setup_steps_complete_flow(self, setup):
         """Test complete setup steps flow."""
-        setup = MediaServerSetup()
-        setup.progress = Mock()
-
-        # Mock all step methods to succeed
-        with patch.object(setup, "_validate_system", return_value=True):
-            with patch.object(setup, "_validate_templates", return_value=True):
-                with patch.object(setup, "_collect_user_configuration"):
-                    with patch.object(setup, "_select_services"):
-                        with patch.object(setup, "_configure_vpn"):
-                            with patch.object(
-                                setup, "_setup_directories_and_files", return_value=True
-                            ):
-                                with patch.object(setup, "_handle_final_setup"):
-                                    setup._run_setup_steps()
+        setup.progress = _fake_progress()
+
+        with Patches(
+            setup,
+            _validate_system=True,
+            _validate_templates=True,
+            _collect_user_configuration=None,
+            _select_services=None,
+            _configure_vpn=None,
+            _setup_directories_and_files=True,
+            _handle_final_setup=None,
+        ) as steps:
+            setup._run_setup_steps()
+
+        steps["_handle_final_setup"].assert_called_once()
 
         # Progress should be called for each step
-        assert setup.progress.start_step.call_count == 7
-        assert setup.progress.step_success.call_count == 7
+        assert setup.progress.start_step.n == 7
+        assert setup.progress.step_success.n == 7
+        assert setup.progress.step_failed.n == 0
 
-    def test_run_setup_steps_system_validation_failure(self):
+    def test_run_setup_steps_system_validation_failure(self, spec_setup, setup_cls):
         """Test setup steps with system validation failure."""
-        setup = MediaServerSetup()
-        setup.progress = Mock()
+        spec_setup._validate_system.return_value = False
+
+        with pytest.raises(SystemExit):
+            setup_cls._run_setup_steps(spec_setup)
 
-        with patch.object(setup, "_validate_system", return_value=False):
-            with pytest.raises(SystemExit):
-                setup._run_setup_steps()
+        spec_setup._validate_templates.assert_not_called()
 
-    def test_run_setup_steps_template_validation_failure(self):
+    def test_run_setup_steps_template_validation_failure(self, spec_setup, setup_cls):
         """Test setup steps with template validation failure."""
-        setup = MediaServerSetup()
-        setup.progress = Mock()
+        spec_setup._validate_system.return_value = True
+        spec_setup._validate_templates.return_value = False
+
+        with pytest.raises(SystemExit):
+            setup_cls._run_setup_steps(spec_setup)
 
-        with patch.object(setup, "_validate_system", return_value=True):
-            with patch.object(setup, "_validate_templates", return_value=False):
-                with pytest.raises(SystemExit):
-                    setup._run_setup_steps()
+        spec_setup._collect_user_configuration.assert_not_called()
 
-    def test_run_setup_steps_directory_setup_failure(self, mock_os_operations):
+    def test_run_setup_steps_directory_setup_failure(self, spec_setup, setup_cls):
         """Test setup steps with directory/file setup failure."""
-        setup = MediaServerSetup()
-        setup.progress = Mock()
-
-        with patch.object(setup, "_validate_system", return_value=True):
-            with patch.object(setup, "_validate_templates", return_value=True):
-                with patch.object(setup, "_collect_user_configuration"):
-                    with patch.object(setup, "_select_services"):
-                        with patch.object(setup, "_configure_vpn"):
-                            with patch.object(
-                                setup,
-                                "_setup_directories_and_files",
-                                return_value=False,
-                            ):
-                                with pytest.raises(SystemExit):
-                                    setup._run_setup_steps()
+        spec_setup._validate_system.return_value = True
+        spec_setup._validate_templates.return_value = True
+        spec_setup._setup_directories_and_files.return_value = False
+
+        with pytest.raises(SystemExit):
+            setup_cls._run_setup_steps(spec_setup)
+
+        spec_setup._handle_final_setup.assert_not_called()
@@ -3,40 +3,123 @@ Tests for system_validators module.
 """
 
 import subprocess
-import time
-from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 from src.system_validators import ContainerTester, ServiceTester, SystemValidator
 
+# Canned responses for the docker commands the validators and testers issue
+DOCKER_RESPONSES = (
+    (["docker", "--version"], "Docker version 24.0.0"),
+    (["docker", "compose", "version"], "Docker Compose version 2.20.0"),
+    (["docker", "ps"], "gluetun\nqbittorrent"),
+    (["docker", "logs"], "INFO: VPN is up\nSUCCESS: Connected to VPN"),
+    (["docker", "exec", "gluetun", "wget"], "198.51.100.1"),
+)
 
-class TestSystemValidator:
-    """Test SystemValidator class."""
 
-    def test_check_docker_failure(self, mock_subprocess):
-        """Test Docker check failure."""
-        mock_subprocess.side_effect = FileNotFoundError()
-        validator = SystemValidator()
-        result = validator._check_docker()
-        assert result is False
+def CP(stdout="", stderr="", rc=0):
+    """Build a CompletedProcess result for a mocked subprocess.run."""
+    return subprocess.CompletedProcess([], rc, stdout, stderr)
 
-    def test_check_docker_compose_failure(self, mock_subprocess):
-        """Test Docker Compose check failure."""
-        mock_subprocess.return_value.returncode = 1
-        validator = SystemValidator()
-        result = validator._check_docker_compose()
-        assert result is False
 
-    def test_check_docker_permissions_failure(self, mock_subprocess):
-        """Test Docker permissions check failure."""
-        mock_subprocess.return_value.returncode = 1
+class _FailSocket:
+    """Socket stand-in whose connection attempts always fail."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def settimeout(self, timeout):
+        pass
+
+    def connect_ex(self, address):
+        return 1
+
+    def close(self):
+        pass
+
+
+class FakeClock:
+    """Monotonic clock that only moves when advanced (or slept on)."""
+
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+    def advance(self, dt):
+        self.t += dt
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Patch time.monotonic and time.sleep with a FakeClock."""
+    clock = FakeClock()
+    monkeypatch.setattr("src.system_validators.time.monotonic", clock)
+    monkeypatch.setattr("src.system_validators.time.sleep", clock.advance)
+    return clock
+
+
+@pytest.fixture
+def fake_process(fake_process):
+    """Patch subprocess.run with the FakeProcess preloaded with docker responses."""
+    for prefix, stdout in DOCKER_RESPONSES:
+        fake_process.register(prefix, stdout=stdout)
+    with patch("subprocess.run", fake_process):
+        yield fake_process
+
+
+@pytest.fixture
+def container_patches(monkeypatch):
+    """Return a helper that stubs ContainerTester's container probes in one call."""
+
+    def apply(is_running=None, ready=None):
+        if is_running is not None:
+            running = (
+                MagicMock(side_effect=is_running)
+                if callable(is_running)
+                else MagicMock(return_value=is_running)
+            )
+            monkeypatch.setattr(ContainerTester, "_is_container_running", running)
+        if ready is not None:
+            monkeypatch.setattr(
+                ContainerTester,
+                "_wait_for_container_ready",
+                MagicMock(return_value=ready),
+            )
+
+    return apply
+
+
+@pytest.mark.xdist_group("validators")
+class TestSystemValidator:
+    """Test SystemValidator class."""
+
+    @pytest.mark.parametrize(
+        "check,command,failure",
+        [
+            ("_check_docker", ["docker", "--version"], {"error": FileNotFoundError()}),
+            (
+                "_check_docker_compose",
+                ["docker", "compose", "version"],
+                {"returncode": 1},
+            ),
+            ("_check_docker_permissions", ["docker", "ps"], {"returncode": 1}),
+        ],
+        ids=["docker", "compose", "permissions"],
+    )
+    @pytest.mark.parametrize("succeeds", [True, False], ids=["success", "failure"])
+    def test_check_docker(self, fake_process, check, command, failure, succeeds):
+        """Test each Docker prerequisite check for success and failure."""
+        if not succeeds:
+            fake_process.register(command, **failure)
         validator = SystemValidator()
-        result = validator._check_docker_permissions()
-        assert result is False
+        result = getattr(validator, check)()
+        assert result is succeeds
 
-    def test_validate_all_success(self, mock_docker_commands):
+    def test_validate_all_success(self, fake_process):
         """Test successful validation of all prerequisites."""
         validator = SystemValidator()
         result = validator.validate_all()
@@ -45,151 +128,128 @@ class TestSystemValidator:
         assert validator.compose_available is True
         assert validator.docker_permissions is True
 
-    def test_validate_all_failure(self, mock_subprocess):
+    def test_validate_all_failure(self, fake_process):
         """Test validation failure."""
-        mock_subprocess.return_value.returncode = 1
+        fake_process.register(["docker"], returncode=1)
         validator = SystemValidator()
         result = validator.validate_all()
         assert result is False
 
 
+@pytest.mark.xdist_group("container_tester")
 class TestContainerTester:
     """Test ContainerTester class."""
 
-    def test_is_container_running_true(self, mock_subprocess):
+    def test_is_container_running_true(self, fake_process):
         """Test container running detection."""
-        mock_subprocess.return_value = MagicMock(stdout="gluetun", returncode=0)
         result = ContainerTester._is_container_running("gluetun")
         assert result is True
 
-    def test_is_container_running_false(self, mock_subprocess):
+    def test_is_container_running_false(self, fake_process):
         """Test container not running detection."""
-        mock_subprocess.return_value = MagicMock(stdout="", returncode=0)
+        fake_process.register(["docker", "ps"], stdout="")
         result = ContainerTester._is_container_running("gluetun")
         assert result is False
 
-    def test_is_valid_ip_valid(self):
-        """Test valid IP validation."""
-        assert ContainerTester._is_valid_ip("192.168.1.1") is True
-        assert ContainerTester._is_valid_ip("10.0.0.1") is True
-        assert ContainerTester._is_valid_ip("172.16.0.1") is True
-
-    def test_is_valid_ip_invalid(self):
-        """Test invalid IP validation."""
-        assert ContainerTester._is_valid_ip("256.1.1.1") is False
-        assert ContainerTester._is_valid_ip("192.168.1") is False
-        assert ContainerTester._is_valid_ip("not.an.ip") is False
-        assert ContainerTester._is_valid_ip("") is False
-
-    def test_wait_for_container_ready_success(self, mock_subprocess):
+    @pytest.mark.parametrize(
+        "ip,expected",
+        [
+            ("192.168.1.1", True),
+            ("10.0.0.1", True),
+            ("172.16.0.1", True),
+            ("256.1.1.1", False),
+            ("192.168.1", False),
+            ("not.an.ip", False),
+            ("", False),
+        ],
+    )
+    def test_is_valid_ip(self, ip, expected):
+        """Test IP address validation."""
+        assert ContainerTester._is_valid_ip(ip) is expected
+
+    def test_wait_for_container_ready_success(self, fake_process):
         """Test successful container ready wait."""
-        mock_subprocess.return_value = MagicMock(
-            returncode=0, stdout="INFO: VPN is up\nSUCCESS: Connected"
-        )
-
         result = ContainerTester._wait_for_container_ready("gluetun", 5)
         assert result is True
 
-    def test_wait_for_container_ready_error(self, mock_subprocess):
+    def test_wait_for_container_ready_error(self, fake_process):
         """Test container ready wait with error."""
-        mock_subprocess.return_value = MagicMock(
-            returncode=0, stdout="ERROR: Connection failed\nFATAL: Cannot connect"
+        fake_process.register(
+            ["docker", "logs"], stdout="ERROR: Connection failed\nFATAL: Cannot connect"
         )
 
         result = ContainerTester._wait_for_container_ready("gluetun", 5)
         assert result is False
 
-    def test_wait_for_container_ready_timeout(self, mock_subprocess):
+    def test_wait_for_container_ready_timeout(self, fake_process, fake_clock):
         """Test container ready wait timeout."""
-        mock_subprocess.return_value = MagicMock(returncode=0, stdout="Starting...")
+        fake_process.register(["docker", "logs"], stdout="Starting...")
 
-        # Mock time to speed up test
-        with patch("time.time", side_effect=[0, 10]):  # Simulate timeout
-            result = ContainerTester._wait_for_container_ready("gluetun", 5)
-            assert result is False
+        result = ContainerTester._wait_for_container_ready("gluetun", 5)
+        assert result is False
+        assert fake_clock() >= 5
 
-    def test_test_gluetun_connection_not_running(self, mock_subprocess):
+    def test_test_gluetun_connection_not_running(self, fake_process):
         """Test Gluetun connection when container not running."""
-        mock_subprocess.return_value = MagicMock(stdout="", returncode=0)
+        fake_process.register(["docker", "ps"], stdout="")
 
         success, message = ContainerTester.test_gluetun_connection(timeout=1)
         assert success is False
         assert "not running" in message
 
-    def test_test_gluetun_connection_success(self, mock_container_operations):
+    def test_test_gluetun_connection_success(self, fake_process, container_patches):
         """Test successful Gluetun connection test."""
-        # Mock container as running
-        with patch.object(ContainerTester, "_is_container_running", return_value=True):
-            with patch.object(
-                ContainerTester, "_wait_for_container_ready", return_value=True
-            ):
-                success, message = ContainerTester.test_gluetun_connection(timeout=1)
-                assert success is True
-                assert "VPN connection successful" in message
-                assert "198.51.100.1" in message
-
-    def test_test_gluetun_connection_not_ready(self, mock_subprocess):
+        container_patches(is_running=True, ready=True)
+
+        success, message = ContainerTester.test_gluetun_connection(timeout=1)
+        assert success is True
+        assert "VPN connection successful" in message
+        assert "198.51.100.1" in message
+
+    def test_test_gluetun_connection_not_ready(self, fake_process, container_patches):
         """Test Gluetun connection when container not ready."""
-        mock_subprocess.return_value = MagicMock(stdout="gluetun", returncode=0)
+        container_patches(is_running=True, ready=False)
 
-        with patch.object(
-            ContainerTester, "_wait_for_container_ready", return_value=False
-        ):
-            success, message = ContainerTester.test_gluetun_connection(timeout=1)
-            assert success is False
-            assert "not become ready" in message
+        success, message = ContainerTester.test_gluetun_connection(timeout=1)
+        assert success is False
+        assert "not become ready" in message
 
-    def test_test_gluetun_connection_vpn_failure(self, mock_subprocess):
+    def test_test_gluetun_connection_vpn_failure(self, fake_process, container_patches):
         """Test Gluetun connection with VPN failure."""
-        # Mock container as running and ready
-        mock_subprocess.return_value = MagicMock(stdout="gluetun", returncode=0)
-
-        with patch.object(ContainerTester, "_is_container_running", return_value=True):
-            with patch.object(
-                ContainerTester, "_wait_for_container_ready", return_value=True
-            ):
-                # Mock VPN test failure
-                with patch("subprocess.run") as mock_run:
-                    mock_run.return_value = MagicMock(
-                        returncode=1, stderr="Connection failed"
-                    )
-
-                    success, message = ContainerTester.test_gluetun_connection(
-                        timeout=1
-                    )
-                    assert success is False
-                    assert "VPN test failed" in message
-
-    def test_get_container_logs_success(self, mock_subprocess):
-        """Test successful container log retrieval."""
-        mock_subprocess.return_value = MagicMock(
-            returncode=0, stdout="Log line 1\nLog line 2"
+        container_patches(is_running=True, ready=True)
+        fake_process.register(
+            ["docker", "exec", "gluetun", "wget"],
+            returncode=1,
+            stderr="Connection failed",
         )
 
+        success, message = ContainerTester.test_gluetun_connection(timeout=1)
+        assert success is False
+        assert "VPN test failed" in message
+
+    def test_get_container_logs_success(self, fake_process):
+        """Test successful container log retrieval."""
+        fake_process.register(["docker", "logs"], stdout="Log line 1\nLog line 2")
+
         logs = ContainerTester.get_container_logs("test_container", 10)
         assert "Log line 1" in logs
         assert "Log line 2" in logs
 
-    def test_get_container_logs_failure(self, mock_subprocess):
+    def test_get_container_logs_failure(self, fake_process):
         """Test container log retrieval failure."""
-        mock_subprocess.return_value = MagicMock(
-            returncode=1, stderr="Container not found"
+        fake_process.register(
+            ["docker", "logs"], returncode=1, stderr="Container not found"
         )
 
         logs = ContainerTester.get_container_logs("test_container", 10)
         assert "Error getting logs" in logs
 
-    def test_show_container_status(self, mock_subprocess, capsys):
+    def test_show_container_status(self, container_patches, capsys):
         """Test container status display."""
-
         # Mock some containers as running, others not
-        def mock_is_running(container):
-            return container in ["gluetun", "qbittorrent"]
+        container_patches(is_running=lambda name: name in ["gluetun", "qbittorrent"])
 
-        with patch.object(
-            ContainerTester, "_is_container_running", side_effect=mock_is_running
-        ):
-            ContainerTester.show_container_status(["gluetun", "qbittorrent", "sonarr"])
+        ContainerTester.show_container_status(["gluetun", "qbittorrent", "sonarr"])
 
         captured = capsys.readouterr()
         assert "Container Status:" in captured.out
@@ -198,6 +258,7 @@ class TestContainerTester:
         assert "sonarr: Not running" in captured.out
 
 
+@pytest.mark.xdist_group("service_tester")
 class TestServiceTester:
     """Test ServiceTester class."""
 
@@ -209,22 +270,20 @@ class TestServiceTester:
         assert success is True
         assert "accessible" in message
 
-    def test_test_service_connectivity_failure(self):
+    def test_test_service_connectivity_failure(self, monkeypatch):
         """Test failed service connectivity."""
-        with patch("socket.socket") as mock_socket:
-            mock_socket_instance = Mock()
-            mock_socket_instance.connect_ex.return_value = 1  # Connection failed
-            mock_socket.return_value = mock_socket_instance
+        # ServiceTester imports socket locally, so patch the module attribute
+        monkeypatch.setattr("socket.socket", _FailSocket)
 
-            success, message = ServiceTester.test_service_connectivity(
-                "test_service", "localhost", 8080
-            )
-            assert success is False
-            assert "not accessible" in message
+        success, message = ServiceTester.test_service_connectivity(
+            "test_service", "localhost", 8080
+        )
+        assert success is False
+        assert "not accessible" in message
 
     def test_test_qbittorrent_through_gluetun_success(self, mock_subprocess):
         """Test successful qBittorrent connectivity through Gluetun."""
-        mock_subprocess.return_value = MagicMock(returncode=0, stdout="200")
+        mock_subprocess.return_value = CP(stdout="200")
 
         success, message = ServiceTester.test_qbittorrent_through_gluetun()
         assert success is True
@@ -232,9 +291,7 @@ class TestServiceTester:
 
     def test_test_qbittorrent_through_gluetun_failure(self, mock_subprocess):
         """Test failed qBittorrent connectivity through Gluetun."""
-        mock_subprocess.return_value = MagicMock(
-            returncode=1, stderr="Connection failed"
-        )
+        mock_subprocess.return_value = CP(stderr="Connection failed", rc=1)
 
         success, message = ServiceTester.test_qbittorrent_through_gluetun()
         assert success is False
@@ -242,7 +299,7 @@ class TestServiceTester:
 
     def test_test_qbittorrent_through_gluetun_wrong_status(self, mock_subprocess):
         """Test qBittorrent connectivity with wrong status code."""
-        mock_subprocess.return_value = MagicMock(returncode=0, stdout="500")
+        mock_subprocess.return_value = CP(stdout="500")
 
         success, message = ServiceTester.test_qbittorrent_through_gluetun()
         assert success is False
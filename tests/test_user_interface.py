@@ -2,16 +2,53 @@
 Tests for user_interface module.
 """
 
-import sys
-from io import StringIO
-from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
 import pytest
 
 from src.user_interface import ProgressReporter, ServiceSelector, UserConfigCollector
+from tests.helpers import stdout_of
 
 
+@pytest.fixture
+def yes_no(monkeypatch):
+    """Replace prompt_yes_no in user_interface; tests set its answers."""
+    mock = Mock()
+    monkeypatch.setattr("src.user_interface.prompt_yes_no", mock)
+    return mock
+
+
+@pytest.fixture
+def text_prompt(monkeypatch):
+    """Replace prompt in user_interface; tests set its answers."""
+    mock = Mock()
+    monkeypatch.setattr("src.user_interface.prompt", mock)
+    return mock
+
+
+@pytest.fixture(scope="session")
+def fake_pwd_entry():
+    """pwd.getpwnam result for the custom user lookups; read-only."""
+    return SimpleNamespace(
+        pw_name="testuser",
+        pw_uid=1001,
+        pw_gid=1001,
+        pw_dir="/home/testuser",
+        pw_shell="/bin/bash",
+    )
+
+
+@pytest.fixture(scope="class")
+def ro_selector(sample_services, sample_categories):
+    """One selector per class for tests that never touch selected_services."""
+    return ServiceSelector(
+        sample_services, sample_categories, {"media_server": ["jellyfin"]}
+    )
+
+
+@pytest.mark.xdist_group("service_selector")
+@pytest.mark.usefixtures("yes_no")
 class TestServiceSelector:
     """Test ServiceSelector class."""
 
@@ -32,12 +69,9 @@ class TestServiceSelector:
         assert selector.services_by_category == services_by_category
         assert selector.selected_services == []
 
-    def test_get_service_context(self, sample_services, sample_categories):
+    def test_get_service_context(self, ro_selector):
         """Test service context generation."""
-        services_by_category = {"media_servers": ["jellyfin"]}
-        selector = ServiceSelector(
-            sample_services, sample_categories, services_by_category
-        )
+        selector = ro_selector
 
         # Test known service contexts
         assert "Popular, feature-rich" in selector._get_service_context("plex")
@@ -49,14 +83,9 @@ class TestServiceSelector:
         # Test unknown service
         assert selector._get_service_context("unknown_service") == ""
 
-    def test_show_category_description(
-        self, sample_services, sample_categories, capsys
-    ):
+    def test_show_category_description(self, ro_selector, capsys):
         """Test category description display."""
-        services_by_category = {"media_server": ["jellyfin"]}
-        selector = ServiceSelector(
-            sample_services, sample_categories, services_by_category
-        )
+        selector = ro_selector
 
         selector._show_category_description("media_server")
         captured = capsys.readouterr()
@@ -71,35 +100,19 @@ class TestServiceSelector:
         captured = capsys.readouterr()
         # Should not output anything for unknown category
 
-    def test_select_category_services_all_selected(
-        self, sample_services, sample_categories
-    ):
+    def test_select_category_services_all_selected(self, ro_selector, yes_no):
         """Test selecting all services in a category."""
-        services_by_category = {"media_server": ["jellyfin"]}
-        selector = ServiceSelector(
-            sample_services, sample_categories, services_by_category
-        )
+        yes_no.return_value = True
 
-        with patch("src.user_interface.prompt_yes_no", return_value=True):
-            selections = selector._select_category_services(
-                ["jellyfin"], "media_server"
-            )
+        selections = ro_selector._select_category_services(["jellyfin"], "media_server")
 
         assert selections == ["jellyfin"]
 
-    def test_select_category_services_none_selected(
-        self, sample_services, sample_categories
-    ):
+    def test_select_category_services_none_selected(self, ro_selector, yes_no):
         """Test selecting no services in a category."""
-        services_by_category = {"media_server": ["jellyfin"]}
-        selector = ServiceSelector(
-            sample_services, sample_categories, services_by_category
-        )
+        yes_no.return_value = False
 
-        with patch("src.user_interface.prompt_yes_no", return_value=False):
-            selections = selector._select_category_services(
-                ["jellyfin"], "media_server"
-            )
+        selections = ro_selector._select_category_services(["jellyfin"], "media_server")
 
         assert selections == []
 
@@ -115,14 +128,18 @@ class TestServiceSelector:
         selector.selected_services = ["jellyfin", "qbittorrent"]
 
         selector._show_selection_summary()
-        captured = capsys.readouterr()
-
-        assert "SELECTED SERVICES" in captured.out
-        assert "Media Servers:" in captured.out
-        assert "Download Clients:" in captured.out
-        assert "• Jellyfin" in captured.out
-        assert "• qBittorrent" in captured.out
-        assert "Total: 2 services" in captured.out
+        out = capsys.readouterr().out
+
+        expected = (
+            "SELECTED SERVICES",
+            "Media Servers:",
+            "Download Clients:",
+            "• Jellyfin",
+            "• qBittorrent",
+            "Total: 2 services",
+        )
+        missing = [line for line in expected if line not in out]
+        assert not missing, missing
 
     def test_show_selection_summary_empty(
         self, sample_services, sample_categories, capsys
@@ -139,7 +156,9 @@ class TestServiceSelector:
 
         assert "No services selected!" in captured.out
 
-    def test_select_services_with_selections(self, sample_services, sample_categories):
+    def test_select_services_with_selections(
+        self, sample_services, sample_categories, yes_no
+    ):
         """Test complete service selection process with selections."""
         services_by_category = {
             "media_servers": ["jellyfin"],
@@ -149,21 +168,16 @@ class TestServiceSelector:
             sample_services, sample_categories, services_by_category
         )
 
-        with patch("src.user_interface.prompt_yes_no") as mock_prompt:
-            # Mock service selections and final confirmation
-            mock_prompt.side_effect = [
-                True,
-                True,
-                True,
-            ]  # Select both services + confirm
+        # Select both services + confirm
+        yes_no.side_effect = [True, True, True]
 
-            result = selector.select_services()
+        result = selector.select_services()
 
         assert "jellyfin" in result
         assert "qbittorrent" in result
 
     def test_select_services_no_selections_exit(
-        self, sample_services, sample_categories
+        self, sample_services, sample_categories, yes_no
     ):
         """Test service selection with no selections and exit choice."""
         services_by_category = {"media_servers": ["jellyfin"]}
@@ -171,13 +185,13 @@ class TestServiceSelector:
             sample_services, sample_categories, services_by_category
         )
 
-        with patch("src.user_interface.prompt_yes_no") as mock_prompt:
-            mock_prompt.side_effect = [False, True]  # No selections + exit
-            with pytest.raises(SystemExit):
-                selector.select_services()
+        yes_no.side_effect = [False, True]  # No selections + exit
+
+        with pytest.raises(SystemExit):
+            selector.select_services()
 
     def test_select_services_no_selections_retry(
-        self, sample_services, sample_categories
+        self, sample_services, sample_categories, yes_no
     ):
         """Test service selection with no selections and retry."""
         services_by_category = {"media_servers": ["jellyfin"]}
@@ -185,19 +199,18 @@ class TestServiceSelector:
             sample_services, sample_categories, services_by_category
         )
 
-        with patch("src.user_interface.prompt_yes_no") as mock_prompt:
-            # First pass: no selections, don't exit
-            # Second pass: select service, confirm
-            mock_prompt.side_effect = [False, False, True, True]
-            with patch.object(selector, "select_services") as mock_select:
-                mock_select.return_value = ["jellyfin"]
-                result = selector.select_services()
+        # First pass: no selections, don't exit
+        # Second pass: select service, confirm
+        yes_no.side_effect = [False, False, True, True]
+
+        result = selector.select_services()
 
-        # The recursive call should be made
-        mock_select.assert_called()
+        assert result == ["jellyfin"]
+        assert selector.selected_services == ["jellyfin"]
+        assert yes_no.call_count == 4
 
     def test_select_services_reject_confirmation(
-        self, sample_services, sample_categories
+        self, sample_services, sample_categories, yes_no
     ):
         """Test service selection with confirmation rejection."""
         services_by_category = {"media_servers": ["jellyfin"]}
@@ -205,82 +218,95 @@ class TestServiceSelector:
             sample_services, sample_categories, services_by_category
         )
 
-        with patch("src.user_interface.prompt_yes_no") as mock_prompt:
-            # Select service, reject confirmation
-            mock_prompt.side_effect = [True, False]
-            with patch.object(selector, "select_services") as mock_select:
-                mock_select.return_value = ["jellyfin"]
-                result = selector.select_services()
+        # First pass: select service, reject confirmation
+        # Second pass: select service, confirm
+        yes_no.side_effect = [True, False, True, True]
+
+        result = selector.select_services()
+
+        assert set(result) == {"jellyfin"}
+        assert yes_no.call_count == 4
 
-        # Should retry
-        mock_select.assert_called()
+    def test_select_services_reject_confirmation_no_duplicates(
+        self, sample_services, sample_categories, yes_no
+    ):
+        """Test rejecting the summary drops earlier picks before starting over."""
+        services_by_category = {"media_servers": ["jellyfin"]}
+        selector = ServiceSelector(
+            sample_services, sample_categories, services_by_category
+        )
 
+        # Select, reject, select again, confirm
+        yes_no.side_effect = [True, False, True, True]
 
+        result = selector.select_services()
+
+        assert result == ["jellyfin"]
+
+
+@pytest.mark.xdist_group("user_config")
+@pytest.mark.usefixtures("yes_no", "text_prompt")
 class TestUserConfigCollector:
     """Test UserConfigCollector class."""
 
-    def test_get_user_info_current_user(self, mock_os_operations):
+    def test_get_user_info_current_user(self, mock_os_operations, yes_no):
         """Test getting current user info when user accepts."""
-        with patch("src.user_interface.prompt_yes_no", return_value=True):
-            username, uid, gid = UserConfigCollector.get_user_info()
+        yes_no.return_value = True
+
+        username, uid, gid = UserConfigCollector.get_user_info()
 
         assert username == "testuser"
         assert uid == 1000
         assert gid == 1000
 
-    def test_get_user_info_custom_user(self, mock_os_operations):
+    def test_get_user_info_custom_user(self, mock_os_operations, yes_no):
         """Test getting custom user info."""
-        with patch("src.user_interface.prompt_yes_no", return_value=False):
-            with patch.object(
-                UserConfigCollector, "_get_custom_user_info"
-            ) as mock_custom:
-                mock_custom.return_value = ("customuser", 1001, 1001)
-                username, uid, gid = UserConfigCollector.get_user_info()
+        yes_no.return_value = False
+
+        with patch.object(UserConfigCollector, "_get_custom_user_info") as mock_custom:
+            mock_custom.return_value = ("customuser", 1001, 1001)
+            username, uid, gid = UserConfigCollector.get_user_info()
 
         assert username == "customuser"
         assert uid == 1001
         assert gid == 1001
 
-    def test_get_custom_user_info_success(self):
+    def test_get_custom_user_info_success(self, text_prompt, fake_pwd_entry):
         """Test successful custom user info retrieval."""
-        with patch("src.user_interface.prompt", return_value="testuser"):
-            with patch("pwd.getpwnam") as mock_pwd:
-                mock_user = Mock()
-                mock_user.pw_uid = 1001
-                mock_user.pw_gid = 1001
-                mock_pwd.return_value = mock_user
+        text_prompt.return_value = "testuser"
 
-                username, uid, gid = UserConfigCollector._get_custom_user_info(
-                    "default_user"
-                )
+        with patch("pwd.getpwnam", return_value=fake_pwd_entry):
+            username, uid, gid = UserConfigCollector._get_custom_user_info(
+                "default_user"
+            )
 
         assert username == "testuser"
         assert uid == 1001
         assert gid == 1001
 
-    def test_get_custom_user_info_user_not_found_exit(self):
+    def test_get_custom_user_info_user_not_found_exit(self, text_prompt, yes_no):
         """Test custom user info with user not found and exit choice."""
-        with patch("src.user_interface.prompt", return_value="nonexistentuser"):
-            with patch("pwd.getpwnam", side_effect=KeyError("User not found")):
-                with patch("src.user_interface.prompt_yes_no", return_value=False):
-                    with pytest.raises(SystemExit):
-                        UserConfigCollector._get_custom_user_info("default_user")
+        text_prompt.return_value = "nonexistentuser"
+        yes_no.return_value = False
+
+        with patch("pwd.getpwnam", side_effect=KeyError("User not found")):
+            with pytest.raises(SystemExit):
+                UserConfigCollector._get_custom_user_info("default_user")
 
-    def test_get_custom_user_info_user_not_found_retry(self):
+    def test_get_custom_user_info_user_not_found_retry(
+        self, text_prompt, yes_no, fake_pwd_entry
+    ):
         """Test custom user info with user not found and retry."""
-        with patch("src.user_interface.prompt") as mock_prompt:
-            mock_prompt.side_effect = ["nonexistentuser", "validuser"]
-            with patch("pwd.getpwnam") as mock_pwd:
-                # First call raises KeyError, second succeeds
-                mock_user = Mock()
-                mock_user.pw_uid = 1001
-                mock_user.pw_gid = 1001
-                mock_pwd.side_effect = [KeyError("User not found"), mock_user]
-
-                with patch("src.user_interface.prompt_yes_no", return_value=True):
-                    username, uid, gid = UserConfigCollector._get_custom_user_info(
-                        "default_user"
-                    )
+        text_prompt.side_effect = ["nonexistentuser", "validuser"]
+        yes_no.return_value = True
+
+        # First call raises KeyError, second succeeds
+        with patch(
+            "pwd.getpwnam", side_effect=[KeyError("User not found"), fake_pwd_entry]
+        ):
+            username, uid, gid = UserConfigCollector._get_custom_user_info(
+                "default_user"
+            )
 
         assert username == "validuser"
         assert uid == 1001
@@ -300,54 +326,38 @@ class TestUserConfigCollector:
         assert docker_dir == "/opt/docker"
         assert media_dir == "/srv/media"
 
-    def test_confirm_setup_confirmed(self, sample_services):
-        """Test setup confirmation when user confirms."""
-        with patch("src.user_interface.prompt_yes_no", return_value=True):
-            result = UserConfigCollector.confirm_setup(
-                "testuser",
-                "/opt/docker",
-                "/srv/media",
-                ["jellyfin", "qbittorrent"],
-                sample_services,
-            )
-
-        assert result is True
-
-    def test_confirm_setup_rejected(self, sample_services):
-        """Test setup confirmation when user rejects."""
-        with patch("src.user_interface.prompt_yes_no", return_value=False):
-            result = UserConfigCollector.confirm_setup(
-                "testuser",
-                "/opt/docker",
-                "/srv/media",
-                ["jellyfin", "qbittorrent"],
-                sample_services,
-            )
-
-        assert result is False
-
-    def test_confirm_setup_display_format(self, sample_services, capsys):
-        """Test that setup confirmation displays properly formatted information."""
-        with patch("src.user_interface.prompt_yes_no", return_value=True):
-            UserConfigCollector.confirm_setup(
-                "testuser",
-                "/opt/docker",
-                "/srv/media",
-                ["jellyfin", "qbittorrent"],
-                sample_services,
-            )
+    @pytest.mark.parametrize(
+        "answer,expected", [(True, True), (False, False)], ids=["confirmed", "rejected"]
+    )
+    def test_confirm_setup(self, sample_services, yes_no, capsys, answer, expected):
+        """Test setup confirmation result and the summary shown before the prompt."""
+        yes_no.return_value = answer
+
+        result = UserConfigCollector.confirm_setup(
+            "testuser",
+            "/opt/docker",
+            "/srv/media",
+            ["jellyfin", "qbittorrent"],
+            sample_services,
+        )
 
-        captured = capsys.readouterr()
-        assert "CONFIGURATION SUMMARY" in captured.out
-        assert "Username: testuser" in captured.out
-        assert "Docker Directory: /opt/docker" in captured.out
-        assert "Media Directory: /srv/media" in captured.out
-        assert "Selected Services (2):" in captured.out
-        assert "• Jellyfin" in captured.out
-        assert "• qBittorrent" in captured.out
-        assert "What happens next:" in captured.out
+        assert result is expected
+        out = capsys.readouterr().out
+        expected_lines = (
+            "CONFIGURATION SUMMARY",
+            "Username: testuser",
+            "Docker Directory: /opt/docker",
+            "Media Directory: /srv/media",
+            "Selected Services (2):",
+            "• Jellyfin",
+            "• qBittorrent",
+            "What happens next:",
+        )
+        missing = [line for line in expected_lines if line not in out]
+        assert not missing, missing
 
 
+@pytest.mark.xdist_group("progress_reporter")
 class TestProgressReporter:
     """Test ProgressReporter class."""
 
@@ -357,78 +367,56 @@ class TestProgressReporter:
         assert reporter.total_steps == 5
         assert reporter.current_step == 0
 
-    def test_start_step(self, capsys):
+    def test_start_step(self):
         """Test starting a new step."""
         reporter = ProgressReporter(3)
-        reporter.start_step("Test Step")
-
-        captured = capsys.readouterr()
-        assert "[1/3] Test Step" in captured.out
+        out = stdout_of(reporter.start_step, "Test Step")
+        assert "[1/3] Test Step" in out
         assert reporter.current_step == 1
 
-    def test_start_multiple_steps(self, capsys):
+    def test_start_multiple_steps(self):
         """Test starting multiple steps."""
         reporter = ProgressReporter(3)
 
-        reporter.start_step("Step One")
-        captured = capsys.readouterr()
-        assert "[1/3] Step One" in captured.out
-
-        reporter.start_step("Step Two")
-        captured = capsys.readouterr()
-        assert "[2/3] Step Two" in captured.out
-
-        reporter.start_step("Step Three")
-        captured = capsys.readouterr()
-        assert "[3/3] Step Three" in captured.out
+        for number, name in enumerate(("Step One", "Step Two", "Step Three"), 1):
+            out = stdout_of(reporter.start_step, name)
+            assert f"[{number}/3] {name}" in out
 
-    def test_step_success(self, capsys):
+    def test_step_success(self):
         """Test reporting step success."""
         reporter = ProgressReporter(1)
-        reporter.step_success("Operation completed successfully")
-
-        captured = capsys.readouterr()
-        assert "✓" in captured.out
-        assert "Operation completed successfully" in captured.out
+        out = stdout_of(reporter.step_success, "Operation completed successfully")
+        assert "✓" in out
+        assert "Operation completed successfully" in out
 
-    def test_step_warning(self, capsys):
+    def test_step_warning(self):
         """Test reporting step warning."""
         reporter = ProgressReporter(1)
-        reporter.step_warning("Minor issue detected")
+        out = stdout_of(reporter.step_warning, "Minor issue detected")
+        assert "⚠" in out
+        assert "Minor issue detected" in out
 
-        captured = capsys.readouterr()
-        assert "⚠" in captured.out
-        assert "Minor issue detected" in captured.out
-
-    def test_step_error(self, capsys):
+    def test_step_error(self):
         """Test reporting step error."""
         reporter = ProgressReporter(1)
-        reporter.step_error("Critical error occurred")
+        out = stdout_of(reporter.step_error, "Critical error occurred")
+        assert "✗" in out
+        assert "Critical error occurred" in out
 
-        captured = capsys.readouterr()
-        assert "✗" in captured.out
-        assert "Critical error occurred" in captured.out
-
-    def test_finish_success(self, capsys):
+    def test_finish_success(self):
         """Test finishing with success."""
         reporter = ProgressReporter(1)
-        reporter.finish(success=True)
-
-        captured = capsys.readouterr()
-        assert "✓ Setup completed successfully!" in captured.out
+        out = stdout_of(reporter.finish, success=True)
+        assert "✓ Setup completed successfully!" in out
 
-    def test_finish_failure(self, capsys):
+    def test_finish_failure(self):
         """Test finishing with failure."""
         reporter = ProgressReporter(1)
-        reporter.finish(success=False)
-
-        captured = capsys.readouterr()
-        assert "✗ Setup completed with issues" in captured.out
+        out = stdout_of(reporter.finish, success=False)
+        assert "✗ Setup completed with issues" in out
 
-    def test_finish_default_success(self, capsys):
+    def test_finish_default_success(self):
         """Test finishing with default success value."""
         reporter = ProgressReporter(1)
-        reporter.finish()  # Default is success=True
-
-        captured = capsys.readouterr()
-        assert "✓ Setup completed successfully!" in captured.out
+        out = stdout_of(reporter.finish)  # Default is success=True
+        assert "✓ Setup completed successfully!" in out
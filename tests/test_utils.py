@@ -2,185 +2,248 @@
 Tests for utils module.
 """
 
-import socket
+import re
 import subprocess
-from io import StringIO
-from pathlib import Path
-from unittest.mock import MagicMock, Mock, patch
+from collections import deque
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.utils import (
-    Colors,
-    generate_encryption_key,
-    get_docker_network_subnet,
-    get_local_network_ip,
-    get_timezone,
-    print_error,
-    print_header,
-    print_info,
-    print_link,
-    print_success,
-    print_warning,
-    prompt,
-    prompt_secret,
-    prompt_yes_no,
-    replace_placeholders,
-    run_command,
-    validate_subnet_format,
-    wait_for_done,
-)
+from tests.helpers import stdout_of
+
+HEADER_TEXT = "Test Header"
+HEADER_RULE = "=" * len(HEADER_TEXT)
+
+ANSI_CODE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+# (subnet, expected) pairs for validate_subnet_format
+SUBNET_CASES = [
+    ("192.168.1.0/24", True),
+    ("10.0.0.0/8", True),
+    ("172.16.0.0/16", True),
+    ("0.0.0.0/0", True),
+    ("", False),
+    ("192.168.1.0", False),
+    ("192.168.1.0/", False),
+    ("192.168.1.0/33", False),
+    ("256.1.1.1/24", False),
+    ("192.168.1/24", False),
+    ("not.a.subnet/24", False),
+    ("192.168.1.0/-1", False),
+]
+
+
+def make_result(**overrides):
+    """Build a stand-in subprocess result; code under test only reads attributes."""
+    fields = {"returncode": 0, "stdout": "", "stderr": ""}
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def cpe():
+    """Build a fresh command failure so no traceback is shared between raises."""
+    return subprocess.CalledProcessError(1, "cmd")
+
+
+def _raise_cpe(*args, **kwargs):
+    """Fail every command with a fresh CalledProcessError."""
+    raise cpe()
+
+
+def _ansi_codes(out):
+    """Return the set of ANSI escape sequences that appear in out."""
+    return {m.group(0) for m in ANSI_CODE.finditer(out)}
+
+
+def _assert_fragments(out, expected):
+    """Assert every expected fragment appears in out, listing any that don't."""
+    missing = [frag for frag in expected if frag not in out]
+    assert not missing, f"missing {missing} in {out!r}"
+
+
+@pytest.fixture(scope="module")
+def utils():
+    """Import src.utils on first use rather than at collection time."""
+    import src.utils
+
+    return src.utils
+
+
+@pytest.fixture(scope="module")
+def encryption_keys(utils):
+    """A few keys generated once and shared by the key tests."""
+    return tuple(utils.generate_encryption_key() for _ in range(4))
+
+
+@pytest.fixture
+def mock_run(monkeypatch):
+    """Replace subprocess.run; tests set its return_value or side_effect."""
+    mock = MagicMock()
+    monkeypatch.setattr("subprocess.run", mock)
+    return mock
+
+
+@pytest.fixture
+def queue_input(monkeypatch):
+    """Return a helper that makes input() answer from a list, in order."""
+
+    def install(responses):
+        answers = deque(responses)
+        monkeypatch.setattr("builtins.input", lambda _: answers.popleft())
+
+    return install
+
+
+@pytest.fixture(scope="class")
+def class_mock_run(request):
+    """Patch subprocess.run once per class; the mock is exposed as cls.mock_run."""
+    mp = pytest.MonkeyPatch()
+    request.cls.mock_run = MagicMock()
+    mp.setattr("subprocess.run", request.cls.mock_run)
+    yield
+    mp.undo()
 
 
 class TestPrintFunctions:
     """Test print utility functions."""
 
-    def test_print_header(self, capsys):
+    def test_print_header(self, utils):
         """Test print_header function."""
-        print_header("Test Header")
-        captured = capsys.readouterr()
+        out = stdout_of(utils.print_header, HEADER_TEXT)
 
-        assert "Test Header" in captured.out
-        assert "=" * len("Test Header") in captured.out
-        assert Colors.BOLD in captured.out
-        assert Colors.CYAN in captured.out
+        _assert_fragments(out, (HEADER_TEXT, HEADER_RULE))
+        assert {utils.Colors.BOLD, utils.Colors.CYAN} <= _ansi_codes(out)
 
-    def test_print_success(self, capsys):
+    def test_print_success(self, utils):
         """Test print_success function."""
-        print_success("Success message")
-        captured = capsys.readouterr()
+        out = stdout_of(utils.print_success, "Success message")
 
-        assert "✓ Success message" in captured.out
-        assert Colors.GREEN in captured.out
+        _assert_fragments(out, ("✓ Success message", utils.Colors.GREEN))
 
-    def test_print_warning(self, capsys):
+    def test_print_warning(self, utils):
         """Test print_warning function."""
-        print_warning("Warning message")
-        captured = capsys.readouterr()
+        out = stdout_of(utils.print_warning, "Warning message")
 
-        assert "⚠ Warning message" in captured.out
-        assert Colors.YELLOW in captured.out
+        _assert_fragments(out, ("⚠ Warning message", utils.Colors.YELLOW))
 
-    def test_print_error(self, capsys):
+    def test_print_error(self, utils):
         """Test print_error function."""
-        print_error("Error message")
-        captured = capsys.readouterr()
+        out = stdout_of(utils.print_error, "Error message")
 
-        assert "✗ Error message" in captured.out
-        assert Colors.RED in captured.out
+        _assert_fragments(out, ("✗ Error message", utils.Colors.RED))
 
-    def test_print_info(self, capsys):
+    def test_print_info(self, utils):
         """Test print_info function."""
-        print_info("Info message")
-        captured = capsys.readouterr()
+        out = stdout_of(utils.print_info, "Info message")
 
-        assert "ℹ Info message" in captured.out
-        assert Colors.CYAN in captured.out
+        _assert_fragments(out, ("ℹ Info message", utils.Colors.CYAN))
 
-    def test_print_link(self, capsys):
+    def test_print_link(self, utils):
         """Test print_link function."""
-        print_link("Test Link", "https://example.com")
-        captured = capsys.readouterr()
+        out = stdout_of(utils.print_link, "Test Link", "https://example.com")
 
-        assert "Test Link: https://example.com" in captured.out
-        assert Colors.UNDERLINE in captured.out
-        assert Colors.BLUE in captured.out
+        _assert_fragments(out, ("Test Link: https://example.com",))
+        assert {utils.Colors.UNDERLINE, utils.Colors.BLUE} <= _ansi_codes(out)
 
 
 class TestPromptFunctions:
     """Test user prompt functions."""
 
-    def test_prompt_with_default(self, monkeypatch):
+    def test_prompt_with_default(self, utils, monkeypatch):
         """Test prompt function with default value."""
         monkeypatch.setattr("builtins.input", lambda _: "")
-        result = prompt("Test question", "default_value")
+        result = utils.prompt("Test question", "default_value")
         assert result == "default_value"
 
-    def test_prompt_with_user_input(self, monkeypatch):
+    def test_prompt_with_user_input(self, utils, monkeypatch):
         """Test prompt function with user input."""
         monkeypatch.setattr("builtins.input", lambda _: "user_input")
-        result = prompt("Test question", "default_value")
+        result = utils.prompt("Test question", "default_value")
         assert result == "user_input"
 
-    def test_prompt_no_default(self, monkeypatch):
+    def test_prompt_no_default(self, utils, monkeypatch):
         """Test prompt function without default."""
         monkeypatch.setattr("builtins.input", lambda _: "user_input")
-        result = prompt("Test question")
+        result = utils.prompt("Test question")
         assert result == "user_input"
 
-    def test_prompt_secret(self, monkeypatch):
+    def test_prompt_secret(self, utils, monkeypatch):
         """Test prompt_secret function."""
         with patch("getpass.getpass", return_value="secret_value"):
-            result = prompt_secret("Enter secret")
+            result = utils.prompt_secret("Enter secret")
             assert result == "secret_value"
 
-    def test_prompt_secret_keyboard_interrupt(self, monkeypatch):
+    def test_prompt_secret_keyboard_interrupt(self, utils, monkeypatch):
         """Test prompt_secret with keyboard interrupt."""
         with patch("getpass.getpass", side_effect=KeyboardInterrupt()):
             with pytest.raises(SystemExit):
-                prompt_secret("Enter secret")
-
-    def test_prompt_yes_no_yes_responses(self, monkeypatch):
+                utils.prompt_secret("Enter secret")
+
+    @pytest.mark.parametrize(
+        "response",
+        ["y", "yes", "true", "1", "Y", "YES", "True"],
+        ids=lambda r: f"yes-{r}",
+    )
+    def test_prompt_yes_no_yes_responses(self, utils, monkeypatch, response):
         """Test prompt_yes_no with various yes responses."""
-        yes_responses = ["y", "yes", "true", "1", "Y", "YES", "True"]
-
-        for response in yes_responses:
-            monkeypatch.setattr("builtins.input", lambda _: response)
-            result = prompt_yes_no("Test question?", default=False)
-            assert result is True
+        monkeypatch.setattr("builtins.input", lambda _: response)
+        result = utils.prompt_yes_no("Test question?", default=False)
+        assert result is True
 
-    def test_prompt_yes_no_no_responses(self, monkeypatch):
+    @pytest.mark.parametrize(
+        "response",
+        ["n", "no", "false", "0", "N", "NO", "False"],
+        ids=lambda r: f"no-{r}",
+    )
+    def test_prompt_yes_no_no_responses(self, utils, monkeypatch, response):
         """Test prompt_yes_no with various no responses."""
-        no_responses = ["n", "no", "false", "0", "N", "NO", "False"]
-
-        for response in no_responses:
-            monkeypatch.setattr("builtins.input", lambda _: response)
-            result = prompt_yes_no("Test question?", default=True)
-            assert result is False
+        monkeypatch.setattr("builtins.input", lambda _: response)
+        result = utils.prompt_yes_no("Test question?", default=True)
+        assert result is False
 
-    def test_prompt_yes_no_default_true(self, monkeypatch):
+    def test_prompt_yes_no_default_true(self, utils, monkeypatch):
         """Test prompt_yes_no with default True."""
         monkeypatch.setattr("builtins.input", lambda _: "")
-        result = prompt_yes_no("Test question?", default=True)
+        result = utils.prompt_yes_no("Test question?", default=True)
         assert result is True
 
-    def test_prompt_yes_no_default_false(self, monkeypatch):
+    def test_prompt_yes_no_default_false(self, utils, monkeypatch):
         """Test prompt_yes_no with default False."""
         monkeypatch.setattr("builtins.input", lambda _: "")
-        result = prompt_yes_no("Test question?", default=False)
+        result = utils.prompt_yes_no("Test question?", default=False)
         assert result is False
 
-    def test_prompt_yes_no_invalid_then_valid(self, monkeypatch, capsys):
+    def test_prompt_yes_no_invalid_then_valid(self, utils, queue_input, capsys):
         """Test prompt_yes_no with invalid then valid response."""
-        responses = iter(["maybe", "invalid", "y"])
-        monkeypatch.setattr("builtins.input", lambda _: next(responses))
+        queue_input(["maybe", "invalid", "y"])
 
-        result = prompt_yes_no("Test question?", default=False)
+        result = utils.prompt_yes_no("Test question?", default=False)
         assert result is True
 
         captured = capsys.readouterr()
         assert "Please answer yes or no" in captured.out
 
-    def test_wait_for_done_enter(self, monkeypatch):
+    def test_wait_for_done_enter(self, utils, monkeypatch):
         """Test wait_for_done with Enter key."""
         monkeypatch.setattr("builtins.input", lambda _: "")
         # Should not raise any exception
-        wait_for_done(1, 3)
+        utils.wait_for_done(1, 3)
 
-    def test_wait_for_done_skip(self, monkeypatch, capsys):
+    def test_wait_for_done_skip(self, utils, monkeypatch, capsys):
         """Test wait_for_done with skip."""
         monkeypatch.setattr("builtins.input", lambda _: "skip")
-        wait_for_done(2, 5)
+        utils.wait_for_done(2, 5)
 
         captured = capsys.readouterr()
         assert "Step skipped" in captured.out
 
-    def test_wait_for_done_invalid_then_valid(self, monkeypatch, capsys):
+    def test_wait_for_done_invalid_then_valid(self, utils, queue_input, capsys):
         """Test wait_for_done with invalid then valid response."""
-        responses = iter(["invalid", ""])
-        monkeypatch.setattr("builtins.input", lambda _: next(responses))
+        queue_input(["invalid", ""])
 
-        wait_for_done(1, 1)
+        utils.wait_for_done(1, 1)
 
         captured = capsys.readouterr()
         assert "Press Enter to continue" in captured.out
@@ -189,254 +252,239 @@ class TestPromptFunctions:
 class TestSystemUtilities:
     """Test system utility functions."""
 
-    def test_run_command_success(self):
+    def test_run_command_success(self, utils, mock_run):
         """Test successful command execution."""
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(returncode=0, stdout="success")
+        mock_run.return_value = make_result(returncode=0, stdout="success")
 
-            result = run_command(["echo", "test"])
+        result = utils.run_command(["echo", "test"])
 
-            assert result.returncode == 0
-            mock_run.assert_called_once()
+        assert result.returncode == 0
+        mock_run.assert_called_once()
 
-    def test_run_command_with_sudo(self):
+    def test_run_command_with_sudo(self, utils, mock_run):
         """Test command execution with sudo."""
-        with patch("subprocess.run") as mock_run:
-            with patch("os.geteuid", return_value=1000):  # Non-root user
-                mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = make_result(returncode=0)
 
-                run_command(["mkdir", "test"], sudo=True)
+        with patch("os.geteuid", return_value=1000):  # Non-root user
+            utils.run_command(["mkdir", "test"], sudo=True)
 
-                # Should prepend sudo
-                call_args = mock_run.call_args[0][0]
-                assert call_args[0] == "sudo"
-                assert call_args[1:] == ["mkdir", "test"]
+        # Should prepend sudo
+        call_args = mock_run.call_args[0][0]
+        assert call_args[0] == "sudo"
+        assert call_args[1:] == ["mkdir", "test"]
 
-    def test_run_command_as_root_no_sudo(self):
+    def test_run_command_as_root_no_sudo(self, utils, mock_run):
         """Test command execution as root doesn't add sudo."""
-        with patch("subprocess.run") as mock_run:
-            with patch("os.geteuid", return_value=0):  # Root user
-                mock_run.return_value = MagicMock(returncode=0)
+        mock_run.return_value = make_result(returncode=0)
 
-                run_command(["mkdir", "test"], sudo=True)
+        with patch("os.geteuid", return_value=0):  # Root user
+            utils.run_command(["mkdir", "test"], sudo=True)
 
-                # Should not prepend sudo
-                call_args = mock_run.call_args[0][0]
-                assert call_args == ["mkdir", "test"]
+        # Should not prepend sudo
+        call_args = mock_run.call_args[0][0]
+        assert call_args == ["mkdir", "test"]
 
-    def test_run_command_failure(self):
+    def test_run_command_failure(self, utils, mock_run):
         """Test command execution failure."""
-        with patch("subprocess.run") as mock_run:
-            mock_run.side_effect = subprocess.CalledProcessError(1, ["false"])
+        mock_run.side_effect = subprocess.CalledProcessError(1, ["false"])
 
-            # Should raise exception with check=True (default)
-            with pytest.raises(subprocess.CalledProcessError):
-                run_command(["false"])
+        # Should raise exception with check=True (default)
+        with pytest.raises(subprocess.CalledProcessError):
+            utils.run_command(["false"])
 
-    def test_run_command_no_check(self):
+    def test_run_command_no_check(self, utils, mock_run):
         """Test command execution without check."""
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(returncode=1, stderr="error")
+        mock_run.return_value = make_result(returncode=1, stderr="error")
 
-            result = run_command(["false"], check=False)
-            assert result.returncode == 1
+        result = utils.run_command(["false"], check=False)
+        assert result.returncode == 1
 
-    def test_generate_encryption_key(self):
+    def test_generate_encryption_key(self, encryption_keys):
         """Test encryption key generation."""
-        key = generate_encryption_key()
-
-        assert isinstance(key, str)
-        assert len(key) == 32
-        # Should only contain alphanumeric characters
-        assert key.isalnum()
+        for key in encryption_keys:
+            assert isinstance(key, str)
+            assert len(key) == 32
+            # Should only contain alphanumeric characters
+            assert key.isalnum()
 
-    def test_generate_encryption_key_uniqueness(self):
+    def test_generate_encryption_key_uniqueness(self, encryption_keys):
         """Test that generated keys are unique."""
-        key1 = generate_encryption_key()
-        key2 = generate_encryption_key()
-
-        assert key1 != key2
+        assert len(set(encryption_keys)) == len(encryption_keys)
 
-    def test_get_timezone_success(self):
+    def test_get_timezone_success(self, utils):
         """Test successful timezone detection."""
         with patch("src.utils.run_command") as mock_run:
-            mock_run.return_value = MagicMock(stdout="America/New_York\n")
+            mock_run.return_value = make_result(stdout="America/New_York\n")
 
-            timezone = get_timezone()
+            timezone = utils.get_timezone()
             assert timezone == "America/New_York"
 
-    def test_get_timezone_failure(self):
+    def test_get_timezone_failure(self, utils):
         """Test timezone detection failure."""
-        with patch(
-            "src.utils.run_command", side_effect=subprocess.CalledProcessError(1, "cmd")
-        ):
-            timezone = get_timezone()
+        with patch("src.utils.run_command", side_effect=_raise_cpe):
+            timezone = utils.get_timezone()
             assert timezone == "UTC"
 
-    def test_get_timezone_file_not_found(self):
+    def test_get_timezone_file_not_found(self, utils):
         """Test timezone detection with missing timedatectl."""
         with patch("src.utils.run_command", side_effect=FileNotFoundError()):
-            timezone = get_timezone()
+            timezone = utils.get_timezone()
             assert timezone == "UTC"
 
-    def test_get_timezone_empty_result(self):
+    def test_get_timezone_empty_result(self, utils):
         """Test timezone detection with empty result."""
         with patch("src.utils.run_command") as mock_run:
-            mock_run.return_value = MagicMock(stdout="")
+            mock_run.return_value = make_result(stdout="")
 
-            timezone = get_timezone()
+            timezone = utils.get_timezone()
             assert timezone == "UTC"
 
 
 class TestNetworkUtilities:
     """Test network utility functions."""
 
-    def test_get_local_network_ip_via_ip_route(self):
-        """Test local IP detection via ip route."""
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(
-                returncode=0, stdout="192.168.1.1 dev eth0 src 192.168.1.100 uid 1000"
-            )
-
-            ip = get_local_network_ip()
-            assert ip == "192.168.1.100"
-
-    def test_get_local_network_ip_via_hostname(self):
-        """Test local IP detection via hostname -I."""
-        with patch("subprocess.run") as mock_run:
-            # First call (ip route) fails, second call (hostname -I) succeeds
-            mock_run.side_effect = [
-                subprocess.CalledProcessError(1, "cmd"),
-                MagicMock(returncode=0, stdout="192.168.1.100 127.0.0.1"),
+    @pytest.fixture(autouse=True)
+    def _reset_mock_run(self, class_mock_run):
+        """Clear answers left on the shared subprocess.run mock by earlier tests."""
+        self.mock_run.reset_mock(return_value=True, side_effect=True)
+
+    @pytest.mark.parametrize(
+        "side_effects,socket_ip,expected",
+        [
+            # ip route succeeds
+            (
+                [
+                    make_result(
+                        returncode=0,
+                        stdout="192.168.1.1 dev eth0 src 192.168.1.100 uid 1000",
+                    )
+                ],
+                None,
+                "192.168.1.100",
+            ),
+            # ip route fails, hostname -I succeeds
+            (
+                [
+                    cpe,
+                    make_result(returncode=0, stdout="192.168.1.100 127.0.0.1"),
+                ],
+                None,
+                "192.168.1.100",
+            ),
+            # ip route and hostname -I fail, ifconfig succeeds
+            (
+                [
+                    cpe,
+                    cpe,
+                    make_result(returncode=0, stdout="inet 192.168.1.100 netmask"),
+                ],
+                None,
+                "192.168.1.100",
+            ),
+            # Every command fails, the socket probe answers
+            (cpe, "192.168.1.100", "192.168.1.100"),
+            # Every command fails and the socket probe raises
+            (
+                cpe,
+                Exception("Socket error"),
+                "localhost",
+            ),
+        ],
+        ids=["ip_route", "hostname", "ifconfig", "socket", "fallback_localhost"],
+    )
+    def test_get_local_network_ip(
+        self, utils, monkeypatch, side_effects, socket_ip, expected
+    ):
+        """Test local IP detection through each fallback method.
+
+        cpe in the table stands for a command failure; each raise gets its own
+        CalledProcessError, built here rather than once at collection.
+        """
+        if side_effects is cpe:
+            self.mock_run.side_effect = _raise_cpe
+        else:
+            self.mock_run.side_effect = [
+                cpe() if effect is cpe else effect for effect in side_effects
             ]
+        if isinstance(socket_ip, Exception):
+            monkeypatch.setattr("socket.socket", MagicMock(side_effect=socket_ip))
+        elif socket_ip is not None:
+            sock = MagicMock()
+            sock.getsockname.return_value = (socket_ip, 12345)
+            monkeypatch.setattr("socket.socket", MagicMock(return_value=sock))
 
-            ip = get_local_network_ip()
-            assert ip == "192.168.1.100"
-
-    def test_get_local_network_ip_via_ifconfig(self):
-        """Test local IP detection via ifconfig."""
-        with patch("subprocess.run") as mock_run:
-            # First two calls fail, ifconfig succeeds
-            mock_run.side_effect = [
-                subprocess.CalledProcessError(1, "cmd"),
-                subprocess.CalledProcessError(1, "cmd"),
-                MagicMock(returncode=0, stdout="inet 192.168.1.100 netmask"),
-            ]
+        ip = utils.get_local_network_ip()
+        assert ip == expected
 
-            ip = get_local_network_ip()
-            assert ip == "192.168.1.100"
-
-    def test_get_local_network_ip_via_socket(self):
-        """Test local IP detection via socket."""
-        with patch(
-            "subprocess.run", side_effect=subprocess.CalledProcessError(1, "cmd")
-        ):
-            with patch("socket.socket") as mock_socket:
-                mock_sock_instance = MagicMock()
-                mock_sock_instance.getsockname.return_value = ("192.168.1.100", 12345)
-                mock_socket.return_value = mock_sock_instance
-
-                ip = get_local_network_ip()
-                assert ip == "192.168.1.100"
-
-    def test_get_local_network_ip_fallback_localhost(self):
-        """Test local IP detection fallback to localhost."""
-        with patch(
-            "subprocess.run", side_effect=subprocess.CalledProcessError(1, "cmd")
-        ):
-            with patch("socket.socket", side_effect=Exception("Socket error")):
-                ip = get_local_network_ip()
-                assert ip == "localhost"
-
-    def test_get_docker_network_subnet_via_inspect(self):
+    def test_get_docker_network_subnet_via_inspect(self, utils):
         """Test Docker subnet detection via network inspect."""
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(
-                returncode=0,
-                stdout='[{"IPAM":{"Config":[{"Subnet":"172.17.0.0/16"}]}}]',
-            )
+        self.mock_run.return_value = make_result(
+            returncode=0,
+            stdout='[{"IPAM":{"Config":[{"Subnet":"172.17.0.0/16"}]}}]',
+        )
 
-            subnet = get_docker_network_subnet()
-            assert subnet == "172.17.0.0/16"
+        subnet = utils.get_docker_network_subnet()
+        assert subnet == "172.17.0.0/16"
 
-    def test_get_docker_network_subnet_fallback(self):
+    def test_get_docker_network_subnet_fallback(self, utils):
         """Test Docker subnet detection fallback."""
-        with patch(
-            "subprocess.run", side_effect=subprocess.CalledProcessError(1, "cmd")
-        ):
-            subnet = get_docker_network_subnet()
-            assert subnet == "172.17.0.0/16"  # Default fallback
+        self.mock_run.side_effect = _raise_cpe
+
+        subnet = utils.get_docker_network_subnet()
+        assert subnet == "172.17.0.0/16"  # Default fallback
 
-    def test_get_docker_network_subnet_invalid_json(self):
+    def test_get_docker_network_subnet_invalid_json(self, utils):
         """Test Docker subnet detection with invalid JSON."""
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(returncode=0, stdout="invalid json")
+        self.mock_run.return_value = make_result(returncode=0, stdout="invalid json")
 
-            subnet = get_docker_network_subnet()
-            assert subnet == "172.17.0.0/16"  # Fallback
+        subnet = utils.get_docker_network_subnet()
+        assert subnet == "172.17.0.0/16"  # Fallback
 
-    def test_get_docker_network_subnet_timeout(self):
+    def test_get_docker_network_subnet_timeout(self, utils):
         """Test Docker subnet detection with timeout."""
-        with patch("subprocess.run", side_effect=subprocess.TimeoutExpired("cmd", 10)):
-            subnet = get_docker_network_subnet()
-            assert subnet == "172.17.0.0/16"  # Fallback
-
-    def test_validate_subnet_format_valid(self):
-        """Test valid subnet format validation."""
-        valid_subnets = ["192.168.1.0/24", "10.0.0.0/8", "172.16.0.0/16", "0.0.0.0/0"]
-
-        for subnet in valid_subnets:
-            assert validate_subnet_format(subnet) is True
-
-    def test_validate_subnet_format_invalid(self):
-        """Test invalid subnet format validation."""
-        invalid_subnets = [
-            "",
-            "192.168.1.0",
-            "192.168.1.0/",
-            "192.168.1.0/33",
-            "256.1.1.1/24",
-            "192.168.1/24",
-            "not.a.subnet/24",
-            "192.168.1.0/-1",
-        ]
-
-        for subnet in invalid_subnets:
-            assert validate_subnet_format(subnet) is False
-
-    def test_replace_placeholders(self):
+        self.mock_run.side_effect = subprocess.TimeoutExpired("cmd", 10)
+
+        subnet = utils.get_docker_network_subnet()
+        assert subnet == "172.17.0.0/16"  # Fallback
+
+    @pytest.mark.parametrize("subnet,expected", SUBNET_CASES)
+    def test_validate_subnet_format(self, utils, subnet, expected):
+        """Test subnet format validation."""
+        assert utils.validate_subnet_format(subnet) is expected
+
+    def test_replace_placeholders(self, utils):
         """Test placeholder replacement."""
         template = "Hello {name}, your age is {age} and city is {city}"
         replacements = {"name": "John", "age": "30", "city": "New York"}
 
-        result = replace_placeholders(template, replacements)
+        result = utils.replace_placeholders(template, replacements)
         expected = "Hello John, your age is 30 and city is New York"
         assert result == expected
 
-    def test_replace_placeholders_missing_keys(self):
+    def test_replace_placeholders_missing_keys(self, utils):
         """Test placeholder replacement with missing keys."""
         template = "Hello {name}, your age is {age}"
         replacements = {"name": "John"}
 
-        result = replace_placeholders(template, replacements)
+        result = utils.replace_placeholders(template, replacements)
         # Missing keys should remain as placeholders
         assert result == "Hello John, your age is {age}"
 
-    def test_replace_placeholders_extra_keys(self):
+    def test_replace_placeholders_extra_keys(self, utils):
         """Test placeholder replacement with extra keys."""
         template = "Hello {name}"
         replacements = {"name": "John", "age": "30", "city": "New York"}
 
-        result = replace_placeholders(template, replacements)
+        result = utils.replace_placeholders(template, replacements)
         assert result == "Hello John"
 
-    def test_replace_placeholders_empty_template(self):
+    def test_replace_placeholders_empty_template(self, utils):
         """Test placeholder replacement with empty template."""
-        result = replace_placeholders("", {"key": "value"})
+        result = utils.replace_placeholders("", {"key": "value"})
         assert result == ""
 
-    def test_replace_placeholders_empty_replacements(self):
+    def test_replace_placeholders_empty_replacements(self, utils):
         """Test placeholder replacement with empty replacements."""
         template = "Hello {name}"
-        result = replace_placeholders(template, {})
+        result = utils.replace_placeholders(template, {})
         assert result == "Hello {name}"
@@ -2,196 +2,256 @@
 Tests for vpn_config module.
 """
 
-import os
-from unittest.mock import MagicMock, Mock, patch
-
 import pytest
 
+from src import vpn_config
+from src.constants import VPN_PROVIDERS
 from src.vpn_config import GluetunConfigurator
 
-
+REQUIRED_PROVIDER_FIELDS = (
+    "name",
+    "provider_name",
+    "supports_openvpn",
+    "supports_wireguard",
+    "credentials_url",
+    "credentials_note",
+)
+
+# Attribute values of a freshly constructed GluetunConfigurator
+_EXPECTED_INIT = {
+    "enabled": False,
+    "provider": None,
+    "vpn_type": "openvpn",
+    "credentials": {},
+    "server_countries": "",
+    "route_qbittorrent": False,
+    "docker_subnet": "",
+}
+
+# Scripted answers for configure(), in the order the prompts are asked
+YES_ROUTE_QBITTORRENT = (
+    True,  # Would you like to configure VPN?
+    True,  # Route qBittorrent through VPN?
+)
+YES_DIRECT_QBITTORRENT = (
+    True,  # Would you like to configure VPN?
+    False,  # Don't route qBittorrent through VPN
+)
+PROMPT_NORDVPN_OVPN = (
+    "1",  # Select NordVPN
+    "1",  # Select OpenVPN
+    "testuser",  # OpenVPN user
+    "Netherlands,Germany",  # Server countries
+    "",  # Accept auto-detected subnet
+)
+PROMPT_MULLVAD_WG = (
+    "2",  # Select Mullvad
+    "2",  # Select WireGuard
+    "10.64.0.1/32",  # WireGuard addresses (uses prompt)
+    "",  # No server countries
+    "",  # Accept auto-detected subnet
+)
+PROMPT_CUSTOM = (
+    "8",  # Select "Other (manual configuration)"
+    "",  # Accept auto-detected subnet
+)
+
+# (prompt_yes_no answers, prompt answers, prompt_secret answers, expected attrs)
+CONFIGURE_CASES = [
+    pytest.param(
+        YES_ROUTE_QBITTORRENT,
+        PROMPT_NORDVPN_OVPN,
+        ("testpass",),  # OpenVPN password
+        {
+            "provider": "nordvpn",
+            "vpn_type": "openvpn",
+            "credentials": {
+                "OPENVPN_USER": "testuser",
+                "OPENVPN_PASSWORD": "testpass",
+            },
+            "server_countries": "Netherlands,Germany",
+            "route_qbittorrent": True,
+            "docker_subnet": "172.17.0.0/16",
+        },
+        id="nordvpn_openvpn",
+    ),
+    pytest.param(
+        YES_DIRECT_QBITTORRENT,
+        PROMPT_MULLVAD_WG,
+        ("wg_private_key_here",),  # WireGuard private key
+        {
+            "provider": "mullvad",
+            "vpn_type": "wireguard",
+            "credentials": {
+                "WIREGUARD_PRIVATE_KEY": "wg_private_key_here",
+                "WIREGUARD_ADDRESSES": "10.64.0.1/32",
+            },
+            "server_countries": "",
+            "route_qbittorrent": False,
+        },
+        id="mullvad_wireguard",
+    ),
+    pytest.param(
+        YES_ROUTE_QBITTORRENT,
+        PROMPT_CUSTOM,
+        (),
+        {"provider": "custom", "route_qbittorrent": True},
+        id="custom_provider",
+    ),
+]
+
+
+_NORDVPN_OPENVPN = {"enabled": True, "provider": "nordvpn", "vpn_type": "openvpn"}
+_NORDVPN_ENV = {"VPN_SERVICE_PROVIDER": "nordvpn", "VPN_TYPE": "openvpn"}
+
+# (configurator attributes, expected get_environment_vars() result)
+ENV_CASES = [
+    pytest.param({"enabled": False}, {}, id="disabled"),
+    pytest.param({"enabled": True, "provider": "custom"}, {}, id="custom_provider"),
+    pytest.param(
+        {
+            **_NORDVPN_OPENVPN,
+            "credentials": {
+                "OPENVPN_USER": "testuser",
+                "OPENVPN_PASSWORD": "testpass",
+            },
+            "server_countries": "Netherlands,Germany",
+            "docker_subnet": "172.17.0.0/16",
+        },
+        {
+            **_NORDVPN_ENV,
+            "OPENVPN_USER": "testuser",
+            "OPENVPN_PASSWORD": "testpass",
+            "SERVER_COUNTRIES": "Netherlands,Germany",
+            "FIREWALL_OUTBOUND_SUBNETS": "172.17.0.0/16",
+        },
+        id="complete_config",
+    ),
+    # Empty credential values are left out
+    pytest.param(
+        {
+            **_NORDVPN_OPENVPN,
+            "credentials": {"OPENVPN_USER": "testuser", "OPENVPN_PASSWORD": ""},
+        },
+        {**_NORDVPN_ENV, "OPENVPN_USER": "testuser"},
+        id="empty_credentials",
+    ),
+    pytest.param(
+        {
+            **_NORDVPN_OPENVPN,
+            "credentials": {"OPENVPN_USER": "testuser"},
+            "server_countries": "",
+        },
+        {**_NORDVPN_ENV, "OPENVPN_USER": "testuser"},
+        id="no_server_countries",
+    ),
+    pytest.param(
+        {
+            **_NORDVPN_OPENVPN,
+            "credentials": {"OPENVPN_USER": "testuser"},
+            "docker_subnet": "",
+        },
+        {**_NORDVPN_ENV, "OPENVPN_USER": "testuser"},
+        id="no_docker_subnet",
+    ),
+]
+
+# (provider, VPN_PROVIDERS override, prompt answer, expected vpn_type)
+SELECT_VPN_TYPE_CASES = [
+    pytest.param("nordvpn", None, "2", "wireguard", id="supports_both"),
+    pytest.param("expressvpn", None, None, "openvpn", id="openvpn_only"),
+    pytest.param(
+        "custom_wg",
+        {
+            "custom_wg": {
+                "name": "Custom WG",
+                "supports_openvpn": False,
+                "supports_wireguard": True,
+            }
+        },
+        None,
+        "wireguard",
+        id="wireguard_only",
+    ),
+]
+
+
+@pytest.fixture
+def config():
+    """Return a fresh GluetunConfigurator."""
+    return GluetunConfigurator()
+
+
+@pytest.mark.xdist_group("gluetun_config")
 class TestGluetunConfigurator:
     """Test GluetunConfigurator class."""
 
-    def test_init(self):
+    def test_init(self, config):
         """Test GluetunConfigurator initialization."""
-        config = GluetunConfigurator()
+        assert {name: vars(config)[name] for name in _EXPECTED_INIT} == _EXPECTED_INIT
+        assert {"OPENVPN_PASSWORD", "WIREGUARD_PRESHARED_KEY"} <= set(
+            config.optional_fields
+        )
 
-        assert config.enabled is False
-        assert config.provider is None
-        assert config.vpn_type == "openvpn"
-        assert config.credentials == {}
-        assert config.server_countries == ""
-        assert config.route_qbittorrent is False
-        assert config.docker_subnet == ""
-        assert "OPENVPN_PASSWORD" in config.optional_fields
-        assert "WIREGUARD_PRESHARED_KEY" in config.optional_fields
-
-    def test_configure_declined(self):
+    def test_configure_declined(self, config, vpn_patches):
         """Test configuration when user declines VPN."""
-        config = GluetunConfigurator()
+        vpn_patches.prompt_yes_no.return_value = False
 
-        with patch("src.vpn_config.prompt_yes_no", return_value=False):
-            result = config.configure()
+        result = config.configure()
 
         assert result is False
         assert config.enabled is False
 
-    def test_configure_accepted_nordvpn_openvpn(self):
-        """Test complete VPN configuration for NordVPN with OpenVPN."""
-        config = GluetunConfigurator()
-
-        with patch("src.vpn_config.prompt_yes_no") as mock_prompt:
-            with patch("src.vpn_config.prompt") as mock_input:
-                with patch("src.vpn_config.prompt_secret") as mock_secret:
-                    with patch(
-                        "src.vpn_config.get_docker_network_subnet"
-                    ) as mock_subnet:
-                        # Configure mocks
-                        mock_prompt.side_effect = [
-                            True,  # Would you like to configure VPN?
-                            True,  # Route qBittorrent through VPN?
-                        ]
-                        mock_input.side_effect = [
-                            "1",  # Select NordVPN
-                            "1",  # Select OpenVPN
-                            "testuser",  # OpenVPN user
-                            "Netherlands,Germany",  # Server countries
-                            "",  # Accept auto-detected subnet
-                        ]
-                        mock_secret.return_value = "testpass"  # OpenVPN password
-                        mock_subnet.return_value = "172.17.0.0/16"
-
-                        result = config.configure()
+    @pytest.mark.parametrize("yes_no,answers,secrets,expected", CONFIGURE_CASES)
+    def test_configure(self, config, vpn_patches, yes_no, answers, secrets, expected):
+        """Test complete VPN configuration for each provider path."""
+        vpn_patches.prompt_yes_no.side_effect = yes_no
+        vpn_patches.prompt.side_effect = answers
+        vpn_patches.prompt_secret.side_effect = secrets
 
-        assert result is True
-        assert config.enabled is True
-        assert config.provider == "nordvpn"
-        assert config.vpn_type == "openvpn"
-        assert config.credentials["OPENVPN_USER"] == "testuser"
-        assert config.credentials["OPENVPN_PASSWORD"] == "testpass"
-        assert config.server_countries == "Netherlands,Germany"
-        assert config.route_qbittorrent is True
-        assert config.docker_subnet == "172.17.0.0/16"
-
-    def test_configure_mullvad_wireguard(self):
-        """Test VPN configuration for Mullvad with WireGuard."""
-        config = GluetunConfigurator()
-
-        with patch("src.vpn_config.prompt_yes_no") as mock_prompt:
-            with patch("src.vpn_config.prompt") as mock_input:
-                with patch("src.vpn_config.prompt_secret") as mock_secret:
-                    with patch(
-                        "src.vpn_config.get_docker_network_subnet"
-                    ) as mock_subnet:
-                        # Configure mocks
-                        mock_prompt.side_effect = [
-                            True,  # Would you like to configure VPN?
-                            False,  # Don't route qBittorrent through VPN
-                        ]
-                        mock_input.side_effect = [
-                            "2",  # Select Mullvad
-                            "2",  # Select WireGuard
-                            "10.64.0.1/32",  # WireGuard addresses (uses prompt, not prompt_secret)
-                            "",  # No server countries
-                            "",  # Accept auto-detected subnet
-                        ]
-                        mock_secret.side_effect = [
-                            "wg_private_key_here",  # WireGuard private key
-                        ]
-                        mock_subnet.return_value = "172.17.0.0/16"
-
-                        result = config.configure()
+        result = config.configure()
 
         assert result is True
         assert config.enabled is True
-        assert config.provider == "mullvad"
-        assert config.vpn_type == "wireguard"
-        assert config.credentials["WIREGUARD_PRIVATE_KEY"] == "wg_private_key_here"
-        assert config.credentials["WIREGUARD_ADDRESSES"] == "10.64.0.1/32"
-        assert config.server_countries == ""
-        assert config.route_qbittorrent is False
+        for attr, value in expected.items():
+            assert getattr(config, attr) == value, attr
 
-    def test_configure_custom_provider(self):
-        """Test VPN configuration with custom provider."""
-        config = GluetunConfigurator()
-
-        with patch("src.vpn_config.prompt_yes_no") as mock_prompt:
-            with patch("src.vpn_config.prompt") as mock_input:
-                with patch("src.vpn_config.get_docker_network_subnet") as mock_subnet:
-                    # Configure mocks
-                    mock_prompt.side_effect = [
-                        True,  # Would you like to configure VPN?
-                        True,  # Route qBittorrent through VPN?
-                    ]
-                    mock_input.side_effect = [
-                        "8",  # Select "Other (manual configuration)"
-                        "",  # Accept auto-detected subnet
-                    ]
-                    mock_subnet.return_value = "172.17.0.0/16"
-
-                    result = config.configure()
-
-        assert result is True
-        assert config.enabled is True
-        assert config.provider == "custom"
-        assert config.route_qbittorrent is True
-
-    def test_select_provider_invalid_then_valid(self):
+    def test_select_provider_invalid_then_valid(self, config, vpn_patches):
         """Test provider selection with invalid then valid choice."""
-        config = GluetunConfigurator()
-
-        with patch("src.vpn_config.prompt") as mock_input:
-            mock_input.side_effect = ["99", "abc", "1"]  # Invalid, invalid, valid
+        # Invalid, invalid, valid
+        vpn_patches.prompt.side_effect = ("99", "abc", "1")
 
-            config._select_provider()
+        config._select_provider()
 
         assert config.provider == "nordvpn"
 
-    def test_select_vpn_type_provider_supports_both(self):
-        """Test VPN type selection when provider supports both protocols."""
-        config = GluetunConfigurator()
-        config.provider = "nordvpn"  # Supports both
-
-        with patch("src.vpn_config.prompt") as mock_input:
-            mock_input.return_value = "2"  # Select WireGuard
-
-            config._select_vpn_type()
-
-        assert config.vpn_type == "wireguard"
-
-    def test_select_vpn_type_openvpn_only(self):
-        """Test VPN type selection for OpenVPN-only provider."""
-        config = GluetunConfigurator()
-        config.provider = "expressvpn"  # OpenVPN only
+    @pytest.mark.parametrize(
+        "provider,providers_patch,answer,expected", SELECT_VPN_TYPE_CASES
+    )
+    def test_select_vpn_type(
+        self,
+        config,
+        vpn_patches,
+        monkeypatch,
+        provider,
+        providers_patch,
+        answer,
+        expected,
+    ):
+        """Test VPN type selection for each protocol capability."""
+        config.provider = provider
+        if providers_patch is not None:
+            monkeypatch.setattr(vpn_config, "VPN_PROVIDERS", providers_patch)
+        vpn_patches.prompt.return_value = answer
 
         config._select_vpn_type()
 
-        assert config.vpn_type == "openvpn"
-
-    def test_select_vpn_type_wireguard_only(self):
-        """Test VPN type selection for WireGuard-only provider."""
-        config = GluetunConfigurator()
-        config.provider = "custom_wg"  # Would need to be added to constants
-
-        # Mock provider info for WireGuard-only
-        with patch(
-            "src.vpn_config.VPN_PROVIDERS",
-            {
-                "custom_wg": {
-                    "name": "Custom WG",
-                    "supports_openvpn": False,
-                    "supports_wireguard": True,
-                }
-            },
-        ):
-            config._select_vpn_type()
+        assert config.vpn_type == expected
+        # Only providers offering both protocols should ask
+        assert vpn_patches.prompt.called is (answer is not None)
 
-        assert config.vpn_type == "wireguard"
-
-    def test_collect_credentials_custom_provider(self):
+    def test_collect_credentials_custom_provider(self, config):
         """Test credential collection for custom provider."""
-        config = GluetunConfigurator()
         config.provider = "custom"
 
         config._collect_credentials()
@@ -199,229 +259,132 @@ class TestGluetunConfigurator:
         # Should not collect credentials for custom provider
         assert config.credentials == {}
 
-    def test_collect_credentials_with_optional_fields(self):
+    def test_collect_credentials_with_optional_fields(self, config, vpn_patches):
         """Test credential collection with optional fields."""
-        config = GluetunConfigurator()
         config.provider = "nordvpn"
         config.vpn_type = "openvpn"
+        vpn_patches.prompt.return_value = "testuser"
+        vpn_patches.prompt_secret.return_value = ""  # Empty password (optional)
 
-        with patch("src.vpn_config.prompt") as mock_input:
-            with patch("src.vpn_config.prompt_secret") as mock_secret:
-                mock_input.return_value = "testuser"
-                mock_secret.return_value = ""  # Empty password (optional)
-
-                config._collect_credentials()
+        config._collect_credentials()
 
         assert config.credentials["OPENVPN_USER"] == "testuser"
         assert config.credentials["OPENVPN_PASSWORD"] == ""
 
-    def test_collect_credentials_required_field_retry(self):
+    def test_collect_credentials_required_field_retry(self, config, vpn_patches):
         """Test credential collection with required field retry."""
-        config = GluetunConfigurator()
         config.provider = "nordvpn"
         config.vpn_type = "openvpn"
+        # First empty (should retry), then valid
+        vpn_patches.prompt.side_effect = ("", "testuser")
+        vpn_patches.prompt_secret.return_value = "testpass"
 
-        with patch("src.vpn_config.prompt") as mock_input:
-            with patch("src.vpn_config.prompt_secret") as mock_secret:
-                # First empty (should retry), then valid
-                mock_input.side_effect = ["", "testuser"]
-                mock_secret.return_value = "testpass"
-
-                config._collect_credentials()
+        config._collect_credentials()
 
         assert config.credentials["OPENVPN_USER"] == "testuser"
         assert config.credentials["OPENVPN_PASSWORD"] == "testpass"
 
-    def test_configure_server_location_specified(self):
+    def test_configure_server_location_specified(self, config, vpn_patches):
         """Test server location configuration with specific countries."""
-        config = GluetunConfigurator()
-
-        with patch("src.vpn_config.prompt") as mock_input:
-            mock_input.return_value = "Netherlands,Germany,Sweden"
+        vpn_patches.prompt.return_value = "Netherlands,Germany,Sweden"
 
-            config._configure_server_location()
+        config._configure_server_location()
 
         assert config.server_countries == "Netherlands,Germany,Sweden"
 
-    def test_configure_server_location_empty(self):
+    def test_configure_server_location_empty(self, config, vpn_patches):
         """Test server location configuration with empty input."""
-        config = GluetunConfigurator()
-
-        with patch("src.vpn_config.prompt") as mock_input:
-            mock_input.return_value = ""
+        vpn_patches.prompt.return_value = ""
 
-            config._configure_server_location()
+        config._configure_server_location()
 
         assert config.server_countries == ""
 
-    def test_configure_docker_network_auto_detected(self):
+    def test_configure_docker_network_auto_detected(self, config, vpn_patches):
         """Test Docker network configuration with auto-detection."""
-        config = GluetunConfigurator()
+        vpn_patches.get_docker_network_subnet.return_value = "172.18.0.0/16"
+        vpn_patches.prompt.return_value = ""  # Accept auto-detected
 
-        with patch("src.vpn_config.get_docker_network_subnet") as mock_subnet:
-            with patch("src.vpn_config.prompt") as mock_input:
-                mock_subnet.return_value = "172.18.0.0/16"
-                mock_input.return_value = ""  # Accept auto-detected
-
-                config._configure_docker_network()
+        config._configure_docker_network()
 
         assert config.docker_subnet == "172.18.0.0/16"
 
-    def test_configure_docker_network_custom_valid(self):
+    def test_configure_docker_network_custom_valid(self, config, vpn_patches):
         """Test Docker network configuration with valid custom subnet."""
-        config = GluetunConfigurator()
-
-        with patch("src.vpn_config.get_docker_network_subnet") as mock_subnet:
-            with patch("src.vpn_config.prompt") as mock_input:
-                mock_subnet.return_value = "172.17.0.0/16"
-                mock_input.return_value = "192.168.100.0/24"  # Custom subnet
+        vpn_patches.prompt.return_value = "192.168.100.0/24"  # Custom subnet
 
-                config._configure_docker_network()
+        config._configure_docker_network()
 
         assert config.docker_subnet == "192.168.100.0/24"
 
-    def test_configure_docker_network_custom_invalid(self):
+    def test_configure_docker_network_custom_invalid(self, config, vpn_patches):
         """Test Docker network configuration with invalid custom subnet."""
-        config = GluetunConfigurator()
+        vpn_patches.prompt.return_value = "invalid.subnet"  # Invalid format
 
-        with patch("src.vpn_config.get_docker_network_subnet") as mock_subnet:
-            with patch("src.vpn_config.prompt") as mock_input:
-                mock_subnet.return_value = "172.17.0.0/16"
-                mock_input.return_value = "invalid.subnet"  # Invalid format
-
-                config._configure_docker_network()
+        config._configure_docker_network()
 
         # Should fall back to auto-detected
         assert config.docker_subnet == "172.17.0.0/16"
 
-    def test_configure_qbittorrent_routing_enabled(self):
+    def test_configure_qbittorrent_routing_enabled(self, config, vpn_patches):
         """Test qBittorrent routing configuration - enabled."""
-        config = GluetunConfigurator()
-
-        with patch("src.vpn_config.prompt_yes_no") as mock_prompt:
-            mock_prompt.return_value = True
+        vpn_patches.prompt_yes_no.return_value = True
 
-            config._configure_qbittorrent_routing()
+        config._configure_qbittorrent_routing()
 
         assert config.route_qbittorrent is True
 
-    def test_configure_qbittorrent_routing_disabled(self):
+    def test_configure_qbittorrent_routing_disabled(self, config, vpn_patches):
         """Test qBittorrent routing configuration - disabled."""
-        config = GluetunConfigurator()
+        vpn_patches.prompt_yes_no.return_value = False
 
-        with patch("src.vpn_config.prompt_yes_no") as mock_prompt:
-            mock_prompt.return_value = False
-
-            config._configure_qbittorrent_routing()
+        config._configure_qbittorrent_routing()
 
         assert config.route_qbittorrent is False
 
-    def test_get_environment_vars_disabled(self):
-        """Test environment variable generation when disabled."""
-        config = GluetunConfigurator()
-        config.enabled = False
-
-        env_vars = config.get_environment_vars()
-
-        assert env_vars == {}
-
-    def test_get_environment_vars_custom_provider(self):
-        """Test environment variable generation for custom provider."""
-        config = GluetunConfigurator()
-        config.enabled = True
-        config.provider = "custom"
+    @pytest.mark.parametrize("attrs,expected", ENV_CASES)
+    def test_get_environment_vars(self, config, attrs, expected):
+        """Test environment variable generation."""
+        config.__dict__.update(attrs)
 
         env_vars = config.get_environment_vars()
 
-        assert env_vars == {}
+        assert env_vars == expected
 
-    def test_get_environment_vars_complete_config(self):
-        """Test environment variable generation with complete configuration."""
-        config = GluetunConfigurator()
-        config.enabled = True
-        config.provider = "nordvpn"
-        config.vpn_type = "openvpn"
-        config.credentials = {
+    def test_shared_gluetun_config_is_read_only(self, gluetun_config):
+        """Test the session gluetun_config renders env vars but rejects edits."""
+        assert gluetun_config.get_environment_vars() == {
+            **_NORDVPN_ENV,
             "OPENVPN_USER": "testuser",
             "OPENVPN_PASSWORD": "testpass",
+            "SERVER_COUNTRIES": "Netherlands,Germany",
+            "FIREWALL_OUTBOUND_SUBNETS": "172.17.0.0/16",
         }
-        config.server_countries = "Netherlands,Germany"
-        config.docker_subnet = "172.17.0.0/16"
-
-        env_vars = config.get_environment_vars()
-
-        assert env_vars["VPN_SERVICE_PROVIDER"] == "nordvpn"
-        assert env_vars["VPN_TYPE"] == "openvpn"
-        assert env_vars["OPENVPN_USER"] == "testuser"
-        assert env_vars["OPENVPN_PASSWORD"] == "testpass"
-        assert env_vars["SERVER_COUNTRIES"] == "Netherlands,Germany"
-        assert env_vars["FIREWALL_OUTBOUND_SUBNETS"] == "172.17.0.0/16"
-
-    def test_get_environment_vars_empty_credentials(self):
-        """Test environment variable generation with empty credentials."""
-        config = GluetunConfigurator()
-        config.enabled = True
-        config.provider = "nordvpn"
-        config.vpn_type = "openvpn"
-        config.credentials = {
-            "OPENVPN_USER": "testuser",
-            "OPENVPN_PASSWORD": "",  # Empty password
-        }
-
-        env_vars = config.get_environment_vars()
-
-        assert env_vars["OPENVPN_USER"] == "testuser"
-        assert "OPENVPN_PASSWORD" not in env_vars  # Should not include empty values
-
-    def test_get_environment_vars_no_server_countries(self):
-        """Test environment variable generation without server countries."""
-        config = GluetunConfigurator()
-        config.enabled = True
-        config.provider = "nordvpn"
-        config.vpn_type = "openvpn"
-        config.credentials = {"OPENVPN_USER": "testuser"}
-        config.server_countries = ""  # No server countries specified
-
-        env_vars = config.get_environment_vars()
-
-        assert "SERVER_COUNTRIES" not in env_vars
-
-    def test_get_environment_vars_no_docker_subnet(self):
-        """Test environment variable generation without Docker subnet."""
-        config = GluetunConfigurator()
-        config.enabled = True
-        config.provider = "nordvpn"
-        config.vpn_type = "openvpn"
-        config.credentials = {"OPENVPN_USER": "testuser"}
-        config.docker_subnet = ""  # No Docker subnet specified
-
-        env_vars = config.get_environment_vars()
 
-        assert "FIREWALL_OUTBOUND_SUBNETS" not in env_vars
-
-    def test_vpn_provider_constants_validation(self):
-        """Test that VPN provider constants have required fields."""
-        from src.constants import VPN_PROVIDERS
-
-        for provider_id, provider_info in VPN_PROVIDERS.items():
-            # Required fields
-            assert "name" in provider_info
-            assert "provider_name" in provider_info
-            assert "supports_openvpn" in provider_info
-            assert "supports_wireguard" in provider_info
-            assert "credentials_url" in provider_info
-            assert "credentials_note" in provider_info
-
-            # At least one protocol should be supported
-            assert (
-                provider_info["supports_openvpn"] or provider_info["supports_wireguard"]
-            )
-
-            # Protocol-specific fields
-            if provider_info["supports_openvpn"]:
-                assert "openvpn_fields" in provider_info
-                assert isinstance(provider_info["openvpn_fields"], list)
-
-            if provider_info["supports_wireguard"]:
-                assert "wireguard_fields" in provider_info
-                assert isinstance(provider_info["wireguard_fields"], list)
+        with pytest.raises(AttributeError):
+            gluetun_config.enabled = False
+        with pytest.raises(TypeError):
+            gluetun_config.credentials["OPENVPN_USER"] = "someone"
+
+    @pytest.mark.parametrize(
+        "provider_id,provider_info",
+        list(VPN_PROVIDERS.items()),
+        ids=list(VPN_PROVIDERS),
+    )
+    def test_vpn_provider_constants_validation(self, provider_id, provider_info):
+        """Test that a VPN provider constant has the required fields."""
+        # Required fields
+        missing = [
+            field for field in REQUIRED_PROVIDER_FIELDS if field not in provider_info
+        ]
+        assert not missing, f"{provider_id} is missing {missing}"
+
+        # At least one protocol should be supported
+        assert provider_info["supports_openvpn"] or provider_info["supports_wireguard"]
+
+        # Protocol-specific fields
+        if provider_info["supports_openvpn"]:
+            assert isinstance(provider_info.get("openvpn_fields"), list)
+
+        if provider_info["supports_wireguard"]:
+            assert isinstance(provider_info.get("wireguard_fields"), list)